@@ -0,0 +1,28 @@
+"""Shared pytest fixtures.
+
+Session-scoped so every test module on a worker reuses one Supabase client.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def supabase_ready():
+    """Initialize Supabase repo using env vars.
+
+    Requires:
+      - SUPABASE_URL
+      - SUPABASE_SERVICE_ROLE_KEY (recommended)
+    """
+    if not os.getenv("SUPABASE_URL"):
+        pytest.skip("SUPABASE_URL not set")
+    if not (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")):
+        pytest.skip("SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY not set")
+
+    from ingestion.supabase_repo import SupabaseRepo
+
+    return SupabaseRepo.from_env()
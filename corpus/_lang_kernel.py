@@ -0,0 +1,18 @@
+"""
+Numba kernel for LanguageDetector script counting.
+
+Optional: importing this module raises ImportError when numba is not
+installed, and LanguageDetector falls back to its NumPy path.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, boundscheck=False)
+def count_script_ids(cp, table, n_ids):
+    """Histogram of table[cp] in one pass, without a temporary id array."""
+    counts = np.zeros(n_ids, dtype=np.int64)
+    for x in cp:
+        counts[table[x]] += 1
+    return counts
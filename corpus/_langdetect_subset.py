@@ -0,0 +1,47 @@
+"""
+langdetect restricted to the languages this corpus handles.
+
+langdetect's module-level detect_langs() loads all 55 bundled profiles
+into a process-wide factory on first use. LanguageDetector only needs a
+few of them, so it uses a private factory loaded with just those.
+
+Optional: importing this module raises ImportError when langdetect is not
+installed.
+"""
+
+import os
+import threading
+from typing import List
+
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+
+# langdetect has no Sinhala profile; absent ones are skipped
+LANGUAGES = ('si', 'ta', 'en')
+
+_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_factory() -> DetectorFactory:
+    """Shared factory holding only the LANGUAGES profiles."""
+    global _factory
+    if _factory is None:
+        with _factory_lock:
+            if _factory is None:
+                profiles = []
+                for lang in LANGUAGES:
+                    path = os.path.join(PROFILES_DIRECTORY, lang)
+                    if os.path.isfile(path):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            profiles.append(f.read())
+                factory = DetectorFactory()
+                factory.load_json_profile(profiles)
+                _factory = factory
+    return _factory
+
+
+def detect_langs(text: str) -> List:
+    """Like langdetect.detect_langs, against the subset factory."""
+    detector = get_factory().create()
+    detector.append(text)
+    return detector.get_probabilities()
@@ -7,14 +7,69 @@ Uses Unicode range detection for native scripts and langdetect as fallback.
 
 from __future__ import annotations
 
+import functools
 import re
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 import logging
 
+try:  # Optional: vectorized script counting
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
+
 logger = logging.getLogger(__name__)
 
+# Skipped entirely when counting scripts (neither numerator nor denominator)
+_PUNCTUATION = '.,!?;:()[]{}"\'-'
+
+_SINHALA_CHAR_RE = re.compile('[\u0D80-\u0DFF]')
+_TAMIL_CHAR_RE = re.compile('[\u0B80-\u0BFF]')
+
+# Script ids in the codepoint lookup table, in _count_scripts' precedence
+# order: skipped characters first, then Sinhala, Tamil, Latin, digits
+# (counted in the total only) and everything else.
+_SKIP, _SINHALA, _TAMIL, _LATIN, _DIGIT, _OTHER = range(6)
+_SCRIPT_TABLE = None
+
+
+def _script_table():
+    """Codepoint -> script id for every codepoint (~1.1 MB, built on first use)."""
+    global _SCRIPT_TABLE
+    if _SCRIPT_TABLE is None:
+        table = _np.full(0x110000, _OTHER, dtype=_np.uint8)
+        # Assign from lowest to highest precedence so later ranges win
+        table[[cp for cp in range(0x110000) if chr(cp).isdigit()]] = _DIGIT
+        table[0x0041:0x007B] = _LATIN
+        table[0x00C0:0x0250] = _LATIN
+        table[0x0B80:0x0C00] = _TAMIL
+        table[0x0D80:0x0E00] = _SINHALA
+        table[[cp for cp in range(0x110000) if chr(cp).isspace()]] = _SKIP
+        table[[ord(c) for c in _PUNCTUATION]] = _SKIP
+        _SCRIPT_TABLE = table
+    return _SCRIPT_TABLE
+
+
+# corpus._lang_kernel.count_script_ids once loaded; False without numba
+_count_kernel = None
+
+
+def _count_script_ids(cp) -> List[int]:
+    """Number of codepoints in `cp` per script id."""
+    global _count_kernel
+    if _count_kernel is None:
+        try:
+            from corpus._lang_kernel import count_script_ids
+            _count_kernel = count_script_ids
+        except ImportError:
+            _count_kernel = False
+    
+    table = _script_table()
+    if _count_kernel:
+        return _count_kernel(cp, table, _OTHER + 1).tolist()
+    return _np.bincount(table[cp], minlength=_OTHER + 1).tolist()
+
 
 class Language(str, Enum):
     """Supported languages."""
@@ -35,9 +90,9 @@ class ScriptType(str, Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class LanguageResult:
-    """Result of language detection."""
+    """Result of language detection; slotted since every detect() builds one."""
     language: Language
     confidence: float
     script_type: ScriptType
@@ -69,23 +124,52 @@ class LanguageDetector:
     DOMINANCE_THRESHOLD = 0.7
     MIXED_THRESHOLD = 0.2
     
-    def __init__(self, use_langdetect_fallback: bool = True):
+    # Results for texts up to this length are memoized per detector
+    CACHE_MAX_CHARS = 512
+    CACHE_SIZE = 4096
+    
+    # detect_batch only starts worker processes for this many distinct texts
+    PARALLEL_MIN_BATCH = 32
+    
+    def __init__(self, use_langdetect_fallback: bool = True, max_scan_chars: Optional[int] = 512):
         """
         Initialize the language detector.
         
         Args:
             use_langdetect_fallback: Use langdetect for Latin text classification
+            max_scan_chars: Longer texts are judged on their first and last
+                max_scan_chars/2 characters (None scans everything)
         """
         self.use_langdetect_fallback = use_langdetect_fallback
+        self.max_scan_chars = max_scan_chars
         self._langdetect_available = False
+        self._detect_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._detect_uncached)
         
         if use_langdetect_fallback:
             try:
-                from langdetect import detect, detect_langs
+                from corpus import _langdetect_subset  # noqa: F401
                 self._langdetect_available = True
             except ImportError:
                 logger.warning("langdetect not installed, using basic Latin detection")
     
+    def __getstate__(self):
+        # The memo wraps a bound method; worker processes build their own
+        state = self.__dict__.copy()
+        del state['_detect_cached']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._detect_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._detect_uncached)
+    
+    def _sample(self, text: str) -> str:
+        """Head and tail of long text; enough to tell its script."""
+        limit = self.max_scan_chars
+        if not limit or len(text) <= limit:
+            return text
+        half = limit // 2
+        return text[:half] + text[-half:]
+    
     def _is_sinhala_char(self, char: str) -> bool:
         """Check if character is Sinhala script."""
         code = ord(char)
@@ -114,8 +198,10 @@ class LanguageDetector:
         Returns:
             Primary script type
         """
-        distribution = self.get_script_distribution(text)
-        
+        return self._script_from_distribution(self.get_script_distribution(text))
+    
+    def _script_from_distribution(self, distribution: Dict[str, float]) -> ScriptType:
+        """Primary script type for an already computed distribution."""
         if not distribution:
             return ScriptType.UNKNOWN
         
@@ -142,12 +228,27 @@ class LanguageDetector:
         """
         Get the distribution of scripts in text.
         
+        Texts longer than max_scan_chars are measured on a head+tail sample.
+        
         Args:
             text: Input text
             
         Returns:
             Dict with script names and their ratios (0.0 to 1.0)
         """
+        text = self._sample(text)
+        if _np is not None and text:
+            counts, total_chars = self._count_scripts_np(text)
+        else:
+            counts, total_chars = self._count_scripts(text)
+        
+        if total_chars == 0:
+            return {}
+        
+        return {script: count / total_chars for script, count in counts.items()}
+    
+    def _count_scripts(self, text: str) -> Tuple[Dict[str, int], int]:
+        """Per-script character counts and the number of counted characters."""
         counts = {
             "sinhala": 0,
             "tamil": 0,
@@ -158,7 +259,7 @@ class LanguageDetector:
         total_chars = 0
         
         for char in text:
-            if char.isspace() or char in '.,!?;:()[]{}"\'-':
+            if char.isspace() or char in _PUNCTUATION:
                 continue
             
             total_chars += 1
@@ -174,21 +275,38 @@ class LanguageDetector:
             else:
                 counts["other"] += 1
         
-        if total_chars == 0:
-            return {}
-        
-        return {script: count / total_chars for script, count in counts.items()}
+        return counts, total_chars
+    
+    def _count_scripts_np(self, text: str) -> Tuple[Dict[str, int], int]:
+        """Same counts as _count_scripts, via one table lookup per codepoint."""
+        cp = _np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+        ids = _count_script_ids(cp)
+        counts = {
+            "sinhala": ids[_SINHALA],
+            "tamil": ids[_TAMIL],
+            "latin": ids[_LATIN],
+            "other": ids[_OTHER]
+        }
+        return counts, sum(ids) - ids[_SKIP]
     
     def detect(self, text: str) -> LanguageResult:
         """
         Detect language from text.
         
+        Repeated short texts return the same cached result object; treat it
+        as read-only.
+        
         Args:
             text: Input text
             
         Returns:
             LanguageResult with language, confidence, and script info
         """
+        if not text or len(text) <= self.CACHE_MAX_CHARS:
+            return self._detect_cached(text)
+        return self._detect_uncached(text)
+    
+    def _detect_uncached(self, text: str) -> LanguageResult:
         if not text or len(text.strip()) < self.MIN_CHARS_FOR_DETECTION:
             return LanguageResult(
                 language=Language.UNKNOWN,
@@ -200,7 +318,7 @@ class LanguageDetector:
         
         # Get script distribution
         distribution = self.get_script_distribution(text)
-        script_type = self.detect_script(text)
+        script_type = self._script_from_distribution(distribution)
         
         # Detect language based on script
         if script_type == ScriptType.SINHALA_SCRIPT:
@@ -230,8 +348,8 @@ class LanguageDetector:
             
             if self._langdetect_available:
                 try:
-                    from langdetect import detect_langs
-                    langs = detect_langs(text)
+                    from corpus._langdetect_subset import detect_langs
+                    langs = detect_langs(self._sample(text))
                     if langs:
                         top_lang = langs[0]
                         if top_lang.lang == 'en':
@@ -288,17 +406,31 @@ class LanguageDetector:
             is_mixed_script=False
         )
     
-    def detect_batch(self, texts: List[str]) -> List[LanguageResult]:
+    def detect_batch(self, texts: List[str], max_workers: Optional[int] = None) -> List[LanguageResult]:
         """
         Detect language for multiple texts.
         
+        Each distinct text is detected once. With max_workers > 1, batches of
+        at least PARALLEL_MIN_BATCH distinct texts are spread over that many
+        worker processes.
+        
         Args:
             texts: List of input texts
+            max_workers: Worker processes for large batches (default: in-process)
             
         Returns:
             List of LanguageResult objects
         """
-        return [self.detect(text) for text in texts]
+        unique = list(dict.fromkeys(texts))
+        if max_workers and max_workers > 1 and len(unique) >= self.PARALLEL_MIN_BATCH:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            chunksize = max(1, len(unique) // (4 * max_workers))
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = dict(zip(unique, pool.map(self._detect_uncached, unique, chunksize=chunksize)))
+        else:
+            results = {text: self.detect(text) for text in unique}
+        return [results[text] for text in texts]
     
     def is_native_script(self, text: str) -> bool:
         """
@@ -318,11 +450,11 @@ class LanguageDetector:
     
     def contains_sinhala(self, text: str) -> bool:
         """Check if text contains Sinhala characters."""
-        return any(self._is_sinhala_char(c) for c in text)
+        return _SINHALA_CHAR_RE.search(text) is not None
     
     def contains_tamil(self, text: str) -> bool:
         """Check if text contains Tamil characters."""
-        return any(self._is_tamil_char(c) for c in text)
+        return _TAMIL_CHAR_RE.search(text) is not None
     
     def extract_by_script(self, text: str, script: ScriptType) -> str:
         """
@@ -335,25 +467,31 @@ class LanguageDetector:
         Returns:
             Filtered text containing only target script characters
         """
-        result = []
+        if script == ScriptType.SINHALA_SCRIPT:
+            keep = self._is_sinhala_char
+        elif script == ScriptType.TAMIL_SCRIPT:
+            keep = self._is_tamil_char
+        elif script == ScriptType.LATIN:
+            keep = self._is_latin_char
+        else:
+            keep = None
         
-        for char in text:
-            if char.isspace():
-                result.append(char)
-                continue
-            
-            if script == ScriptType.SINHALA_SCRIPT and self._is_sinhala_char(char):
-                result.append(char)
-            elif script == ScriptType.TAMIL_SCRIPT and self._is_tamil_char(char):
-                result.append(char)
-            elif script == ScriptType.LATIN and self._is_latin_char(char):
-                result.append(char)
-        
-        return ''.join(result).strip()
+        # Decide once per distinct character, then drop the rest in one
+        # C-level translate pass
+        delete = {
+            ord(char): None for char in set(text)
+            if not (char.isspace() or (keep is not None and keep(char)))
+        }
+        return text.translate(delete).strip()
+
+
+_default_detector: Optional[LanguageDetector] = None
 
 
 # Convenience function
 def detect_language(text: str) -> LanguageResult:
     """Convenience function to detect language."""
-    detector = LanguageDetector()
-    return detector.detect(text)
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = LanguageDetector()
+    return _default_detector.detect(text)
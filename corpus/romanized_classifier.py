@@ -12,6 +12,7 @@ Uses pattern matching with Singlish/Tamilish markers and n-gram analysis.
 
 from __future__ import annotations
 
+import functools
 import json
 import re
 from dataclasses import dataclass, field
@@ -22,6 +23,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Latin-letter words, matched against lowercased text
+_TOKEN_RE = re.compile(r'\b[a-z]+\b')
+
 
 class RomanizedType(str, Enum):
     """Types of Romanized text."""
@@ -32,7 +36,7 @@ class RomanizedType(str, Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeSwitch:
     """Represents a code-switching point in text."""
     start_pos: int
@@ -42,9 +46,9 @@ class CodeSwitch:
     text_segment: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RomanizedResult:
-    """Result of Romanized text classification."""
+    """Result of Romanized text classification; slotted since every classify() builds one."""
     classification: RomanizedType
     confidence: float
     singlish_score: float
@@ -86,6 +90,17 @@ class RomanizedClassifier:
         "appointment", "opd", "patient", "medicine", "pharmacy", "emergency"
     }
     
+    # Bits in the marker index; a token may carry both
+    _SINGLISH_BIT = 1
+    _TAMILISH_BIT = 2
+    
+    # Results for texts up to this length are memoized per classifier
+    CACHE_MAX_CHARS = 512
+    CACHE_SIZE = 4096
+    
+    # classify_batch only starts worker processes for this many distinct texts
+    PARALLEL_MIN_BATCH = 32
+    
     # Confidence thresholds
     SINGLISH_THRESHOLD = 0.3
     TAMILISH_THRESHOLD = 0.3
@@ -109,6 +124,20 @@ class RomanizedClassifier:
             default_path = Path(__file__).parent / "training_data" / "romanized_patterns.json"
             if default_path.exists():
                 self._load_patterns(default_path)
+        
+        self._build_marker_index()
+        self._build_single_word_index()
+        self._classify_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._classify_uncached)
+    
+    def __getstate__(self):
+        # The memo wraps a bound method; worker processes build their own
+        state = self.__dict__.copy()
+        del state['_classify_cached']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._classify_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._classify_uncached)
     
     def _flatten_markers(self, marker_dict: Dict[str, List[str]]) -> set:
         """Flatten marker dictionary to a set of all markers."""
@@ -117,6 +146,24 @@ class RomanizedClassifier:
             markers.update(m.lower() for m in category_markers)
         return markers
     
+    def _build_marker_index(self) -> None:
+        """Map each marker to its language bits so a token needs one lookup."""
+        index: Dict[str, int] = {}
+        for marker in self.singlish_markers:
+            index[marker] = index.get(marker, 0) | self._SINGLISH_BIT
+        for marker in self.tamilish_markers:
+            index[marker] = index.get(marker, 0) | self._TAMILISH_BIT
+        self._marker_index = index
+    
+    def _build_single_word_index(self) -> None:
+        """Precompute results for texts that are a single known word.
+        
+        Markers and English health terms are the common one-word inputs;
+        classify() answers those with a dict lookup instead of tokenizing.
+        """
+        words = set(self._marker_index) | self.ENGLISH_HEALTH_TERMS
+        self._single_word = {word: self._classify_uncached(word) for word in words}
+    
     def _load_patterns(self, path: Path) -> None:
         """Load patterns from JSON file."""
         try:
@@ -135,26 +182,7 @@ class RomanizedClassifier:
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text into words."""
         # Simple tokenization - split on whitespace and punctuation
-        text = text.lower()
-        tokens = re.findall(r'\b[a-z]+\b', text)
-        return tokens
-    
-    def _count_marker_matches(
-        self, 
-        tokens: List[str], 
-        markers: set
-    ) -> Tuple[int, List[str]]:
-        """
-        Count how many tokens match markers.
-        
-        Returns:
-            Tuple of (count, matched_markers)
-        """
-        matched = []
-        for token in tokens:
-            if token in markers:
-                matched.append(token)
-        return len(matched), matched
+        return _TOKEN_RE.findall(text.lower())
     
     def _calculate_scores(
         self, 
@@ -176,13 +204,19 @@ class RomanizedClassifier:
             # All tokens are common English terms
             return 0.0, 0.0, 1.0, []
         
-        # Count matches
-        singlish_count, singlish_matched = self._count_marker_matches(
-            filtered_tokens, self.singlish_markers
-        )
-        tamilish_count, tamilish_matched = self._count_marker_matches(
-            filtered_tokens, self.tamilish_markers
-        )
+        # Count matches in one pass over the tokens
+        singlish_matched = []
+        tamilish_matched = []
+        marker_index = self._marker_index
+        for token in filtered_tokens:
+            bits = marker_index.get(token)
+            if bits:
+                if bits & self._SINGLISH_BIT:
+                    singlish_matched.append(token)
+                if bits & self._TAMILISH_BIT:
+                    tamilish_matched.append(token)
+        singlish_count = len(singlish_matched)
+        tamilish_count = len(tamilish_matched)
         
         # Calculate scores based on proportion of matched markers
         total_non_english = len(filtered_tokens)
@@ -201,12 +235,23 @@ class RomanizedClassifier:
         """
         Classify Romanized text.
         
+        Repeated short texts return the same cached result object; treat it
+        as read-only.
+        
         Args:
             text: Input text (should be Latin script)
             
         Returns:
             RomanizedResult with classification and scores
         """
+        if not text or len(text) <= self.CACHE_MAX_CHARS:
+            single = self._single_word.get(text.strip().lower()) if text else None
+            if single is not None:
+                return single
+            return self._classify_cached(text)
+        return self._classify_uncached(text)
+    
+    def _classify_uncached(self, text: str) -> RomanizedResult:
         if not text or not text.strip():
             return RomanizedResult(
                 classification=RomanizedType.UNKNOWN,
@@ -216,7 +261,9 @@ class RomanizedClassifier:
                 english_score=0.0
             )
         
-        tokens = self._tokenize(text)
+        # Lowercased once; tokenizing and code-switch positions both use it
+        lowered = text.lower()
+        tokens = _TOKEN_RE.findall(lowered)
         
         if not tokens:
             return RomanizedResult(
@@ -248,7 +295,7 @@ class RomanizedClassifier:
             confidence = 0.6
         
         # Detect code switches
-        code_switches = self.extract_code_switches(text)
+        code_switches = self._code_switches(lowered, tokens)
         is_code_mixed = len(code_switches) > 0
         
         return RomanizedResult(
@@ -272,8 +319,12 @@ class RomanizedClassifier:
         Returns:
             List of CodeSwitch objects
         """
+        lowered = text.lower()
+        return self._code_switches(lowered, _TOKEN_RE.findall(lowered))
+    
+    def _code_switches(self, lowered: str, tokens: List[str]) -> List[CodeSwitch]:
+        """extract_code_switches for text that is already lowercased and tokenized."""
         switches = []
-        tokens = self._tokenize(text)
         
         if len(tokens) < 2:
             return switches
@@ -286,7 +337,7 @@ class RomanizedClassifier:
             
             if curr_lang != prev_lang and curr_lang != "unknown" and prev_lang != "unknown":
                 # Find position in original text (approximate)
-                token_pos = text.lower().find(token)
+                token_pos = lowered.find(token)
                 
                 switches.append(CodeSwitch(
                     start_pos=token_pos,
@@ -304,27 +355,42 @@ class RomanizedClassifier:
     def _get_token_language(self, token: str) -> str:
         """Determine language of a single token."""
         token = token.lower()
+        bits = self._marker_index.get(token, 0)
         
-        if token in self.singlish_markers:
+        if bits & self._SINGLISH_BIT:
             return "singlish"
-        elif token in self.tamilish_markers:
+        elif bits & self._TAMILISH_BIT:
             return "tamilish"
         elif token in self.ENGLISH_HEALTH_TERMS:
             return "english"
         else:
             return "unknown"
     
-    def classify_batch(self, texts: List[str]) -> List[RomanizedResult]:
+    def classify_batch(self, texts: List[str], max_workers: Optional[int] = None) -> List[RomanizedResult]:
         """
         Classify multiple texts.
         
+        Each distinct text is classified once. With max_workers > 1, batches
+        of at least PARALLEL_MIN_BATCH distinct texts are spread over that many
+        worker processes.
+        
         Args:
             texts: List of input texts
+            max_workers: Worker processes for large batches (default: in-process)
             
         Returns:
             List of RomanizedResult objects
         """
-        return [self.classify(text) for text in texts]
+        unique = list(dict.fromkeys(texts))
+        if max_workers and max_workers > 1 and len(unique) >= self.PARALLEL_MIN_BATCH:
+            from concurrent.futures import ProcessPoolExecutor
+            
+            chunksize = max(1, len(unique) // (4 * max_workers))
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = dict(zip(unique, pool.map(self._classify_uncached, unique, chunksize=chunksize)))
+        else:
+            results = {text: self.classify(text) for text in unique}
+        return [results[text] for text in texts]
     
     def is_romanized_local(self, text: str) -> bool:
         """
@@ -369,8 +435,13 @@ class RomanizedClassifier:
         return None
 
 
+_default_classifier: Optional[RomanizedClassifier] = None
+
+
 # Convenience function
 def classify_romanized(text: str) -> RomanizedResult:
     """Convenience function to classify Romanized text."""
-    classifier = RomanizedClassifier()
-    return classifier.classify(text)
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = RomanizedClassifier()
+    return _default_classifier.classify(text)
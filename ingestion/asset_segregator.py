@@ -3,6 +3,7 @@ Asset Segregator
 Separates HTML content from PDFs and images for appropriate processing
 """
 
+import asyncio
 from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse
 import logging
@@ -28,8 +29,24 @@ class AssetSegregator:
     def __init__(self, repo: Optional[SupabaseRepo] = None):
         """Initialize asset segregator."""
         self.repo = repo or SupabaseRepo.from_env()
+        # Shared httpx.AsyncClient while used as an async context manager
+        self._http_client = None
         logger.info("AssetSegregator initialized")
     
+    async def __aenter__(self) -> "AssetSegregator":
+        """Open one pooled HTTP client for all downloads until exit."""
+        import httpx
+        
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
     def detect_asset_type(self, url: str, content_type: Optional[str] = None) -> str:
         """
         Detect asset type from URL and content-type
@@ -152,14 +169,14 @@ class AssetSegregator:
         
         return context_obj
     
-    async def download_and_store_asset(
+    async def fetch_and_store_asset(
         self,
         url: str,
         asset_type: str,
         context_id: str
-    ) -> Optional[str]:
+    ) -> Optional[Dict[str, Any]]:
         """
-        Download asset and store in Supabase Storage
+        Download asset and store in Supabase Storage, leaving raw_ingest alone
         
         Args:
             url: Asset URL
@@ -167,50 +184,93 @@ class AssetSegregator:
             context_id: Associated context document ID
             
         Returns:
-            Storage path or None if failed
+            Download record for record_downloads, or None if failed
         """
         try:
             import httpx
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=30.0)
-                response.raise_for_status()
-                
-                # Determine storage path
-                file_ext = Path(urlparse(url).path).suffix or f'.{asset_type}'
-                storage_path = f"{asset_type}s-raw/{context_id}/{Path(url).name}"
-                
-                content_type = response.headers.get('content-type', 'application/octet-stream')
-                self.repo.upload_bytes(storage_path, response.content, content_type=content_type)
-                
-                logger.info(f"✓ Uploaded to storage: {storage_path}")
-                
-                # Update raw_ingest with storage reference (best-effort)
-                try:
-                    assets = self.repo.get_raw_ingest_assets(context_id)
-                    downloaded = dict((assets or {}).get('downloaded') or {})
-                    downloaded[asset_type] = {
-                        'url': url,
-                        'storage_path': storage_path,
-                        'uploaded_at': utc_now_iso(),
-                        'size_bytes': len(response.content),
-                    }
-                    merged_assets = dict(assets or {})
-                    merged_assets['downloaded'] = downloaded
-
-                    # asset_counts is optional here; keep existing value if present
-                    row = self.repo.get_raw_ingest(context_id, columns='asset_counts') or {}
-                    asset_counts = row.get('asset_counts') or {}
-                    self.repo.update_raw_ingest_assets(context_id, merged_assets, asset_counts)
-                except Exception as e:
-                    logger.warning("Could not update raw_ingest assets metadata: %s", e)
-                
-                return storage_path
-                
+            if self._http_client is not None:
+                response = await self._http_client.get(url, timeout=30.0)
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(url, timeout=30.0)
+            
+            response.raise_for_status()
+            
+            # Determine storage path
+            file_ext = Path(urlparse(url).path).suffix or f'.{asset_type}'
+            storage_path = f"{asset_type}s-raw/{context_id}/{Path(url).name}"
+            
+            content_type = response.headers.get('content-type', 'application/octet-stream')
+            await asyncio.to_thread(
+                self.repo.upload_bytes, storage_path, response.content, content_type=content_type
+            )
+            
+            logger.info(f"✓ Uploaded to storage: {storage_path}")
+            
+            return {
+                'asset_type': asset_type,
+                'url': url,
+                'storage_path': storage_path,
+                'uploaded_at': utc_now_iso(),
+                'size_bytes': len(response.content),
+            }
+            
         except Exception as e:
             logger.error(f"Failed to download {url}: {str(e)}")
             return None
     
+    def record_downloads(self, context_id: str, downloads: List[Dict[str, Any]]) -> None:
+        """
+        Merge download records into raw_ingest assets['downloaded'] (best-effort)
+        
+        One read and one write per call. Entries keep the stored shape,
+        downloaded[asset_type] = {url, storage_path, uploaded_at, size_bytes};
+        of several assets of one type, the last record is the one kept.
+        
+        Args:
+            context_id: Associated context document ID
+            downloads: Records returned by fetch_and_store_asset
+        """
+        if not downloads:
+            return
+        try:
+            row = self.repo.get_raw_ingest(context_id, columns='assets,asset_counts') or {}
+            assets = dict(row.get('assets') or {})
+            downloaded = dict(assets.get('downloaded') or {})
+            for record in downloads:
+                record = dict(record)
+                downloaded[record.pop('asset_type')] = record
+            assets['downloaded'] = downloaded
+            
+            # asset_counts is optional here; keep existing value if present
+            self.repo.update_raw_ingest_assets(context_id, assets, row.get('asset_counts') or {})
+        except Exception as e:
+            logger.warning("Could not update raw_ingest assets metadata: %s", e)
+    
+    async def download_and_store_asset(
+        self,
+        url: str,
+        asset_type: str,
+        context_id: str
+    ) -> Optional[str]:
+        """
+        Download asset, store it, and record it on raw_ingest
+        
+        Args:
+            url: Asset URL
+            asset_type: Type of asset ('pdf', 'image', etc.)
+            context_id: Associated context document ID
+            
+        Returns:
+            Storage path or None if failed
+        """
+        record = await self.fetch_and_store_asset(url, asset_type, context_id)
+        if record is None:
+            return None
+        await asyncio.to_thread(self.record_downloads, context_id, [record])
+        return record['storage_path']
+    
     def create_ocr_queue_entry(
         self,
         storage_path: str,
@@ -4,7 +4,6 @@ Politely crawls government health websites with rate limiting and robots.txt res
 """
 
 import asyncio
-import time
 from typing import Dict, List, Optional, Any
 from urllib.parse import urlparse, urljoin
 from urllib.robotparser import RobotFileParser
@@ -16,6 +15,7 @@ from crawl4ai.extraction_strategy import LLMExtractionStrategy, JsonCssExtractio
 from crawl4ai.chunking_strategy import RegexChunking  # type: ignore
 from crawl4ai.async_configs import CacheMode  # type: ignore
 
+from ingestion.rate_limit import DomainTokenBucket
 from ingestion.supabase_repo import SupabaseRepo, utc_now_iso
 
 
@@ -23,6 +23,18 @@ from ingestion.supabase_repo import SupabaseRepo, utc_now_iso
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Health-related keywords for link scoring (Sinhala, Tamil, English).
+# 'schedule' is listed twice, so it carries double weight.
+LINK_KEYWORDS = (
+    # English
+    'clinic', 'hospital', 'disease', 'vaccine', 'health', 'medical',
+    'dengue', 'leptospirosis', 'cholera', 'schedule', 'doctor',
+    # Sinhala (romanized for URL matching)
+    'auruwedaya', 'behethshalawa', 'roga', 'ennath',
+    # Common URL patterns
+    'pdf', 'circular', 'advisory', 'report', 'schedule'
+)
+
 
 class AdaptiveCrawlerAgent:
     """
@@ -51,14 +63,52 @@ class AdaptiveCrawlerAgent:
         self.user_agent = user_agent
         
         # Domain-specific tracking for politeness
-        self.domain_last_access: Dict[str, float] = {}
+        self.domain_buckets: Dict[str, DomainTokenBucket] = {}
         self.robots_cache: Dict[str, RobotFileParser] = {}
         
+        # Shared browser while used as an async context manager
+        self._browser: Optional[AsyncWebCrawler] = None
+        
         # Backend
         self.repo = SupabaseRepo.from_env()
         
         logger.info(f"Initialized AdaptiveCrawlerAgent with {rate_limit_delay}s rate limit")
     
+    async def __aenter__(self) -> "AdaptiveCrawlerAgent":
+        """Start one browser and reuse it for every crawl until exit."""
+        browser = AsyncWebCrawler(
+            verbose=True,
+            headless=True,
+            user_agent=self.user_agent
+        )
+        await browser.__aenter__()
+        self._browser = browser
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            await browser.__aexit__(*exc_info)
+    
+    async def _fetch(self, url: str, strategy: Any) -> Any:
+        """Run one crawl on the shared browser, or a short-lived one."""
+        kwargs = dict(
+            url=url,
+            extraction_strategy=strategy,
+            cache_mode=CacheMode.BYPASS,  # Always fetch fresh data
+            word_count_threshold=10,
+            chunking_strategy=RegexChunking(patterns=[r'\n\n'])
+        )
+        if self._browser is not None:
+            return await self._browser.arun(**kwargs)
+        
+        async with AsyncWebCrawler(
+            verbose=True,
+            headless=True,
+            user_agent=self.user_agent
+        ) as crawler:
+            return await crawler.arun(**kwargs)
+    
     def _get_domain(self, url: str) -> str:
         """Extract domain from URL"""
         parsed = urlparse(url)
@@ -109,14 +159,13 @@ class AdaptiveCrawlerAgent:
         """
         domain = self._get_domain(url)
         
-        if domain in self.domain_last_access:
-            elapsed = time.time() - self.domain_last_access[domain]
-            if elapsed < self.rate_limit_delay:
-                sleep_time = self.rate_limit_delay - elapsed
-                logger.info(f"Throttling {domain} for {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
+        bucket = self.domain_buckets.get(domain)
+        if bucket is None:
+            bucket = self.domain_buckets[domain] = DomainTokenBucket(self.rate_limit_delay)
         
-        self.domain_last_access[domain] = time.time()
+        waited = await bucket.acquire()
+        if waited > 0:
+            logger.info(f"Throttled {domain} for {waited:.2f}s")
     
     async def crawl(
         self,
@@ -170,35 +219,24 @@ class AdaptiveCrawlerAgent:
         # Attempt crawl with retries
         for attempt in range(self.max_retries):
             try:
-                async with AsyncWebCrawler(
-                    verbose=True,
-                    headless=True,
-                    user_agent=self.user_agent
-                ) as crawler:
-                    result = await crawler.arun(
+                result = await self._fetch(url, strategy)
+                
+                if result.success:
+                    # Build context object
+                    context_obj = self._build_context_object(
+                        result=result,
                         url=url,
-                        extraction_strategy=strategy,
-                        cache_mode=CacheMode.BYPASS,  # Always fetch fresh data
-                        word_count_threshold=10,
-                        chunking_strategy=RegexChunking(patterns=[r'\n\n'])
+                        source_config=source_config
                     )
                     
-                    if result.success:
-                        # Build context object
-                        context_obj = self._build_context_object(
-                            result=result,
-                            url=url,
-                            source_config=source_config
-                        )
-                        
-                        # Store in Supabase
-                        await self._store_to_supabase(context_obj)
-                        
-                        logger.info(f"✓ Successfully crawled: {url}")
-                        return context_obj
-                    else:
-                        logger.error(f"Crawl failed (attempt {attempt + 1}): {result.error_message}")
-                        
+                    # Store in Supabase
+                    await self._store_to_supabase(context_obj)
+                    
+                    logger.info(f"✓ Successfully crawled: {url}")
+                    return context_obj
+                else:
+                    logger.error(f"Crawl failed (attempt {attempt + 1}): {result.error_message}")
+                    
             except Exception as e:
                 logger.error(f"Exception on attempt {attempt + 1}: {str(e)}")
                 if attempt < self.max_retries - 1:
@@ -358,22 +396,11 @@ class AdaptiveCrawlerAgent:
         Returns:
             Relevance score (0.0 - 1.0)
         """
-        # Health-related keywords (Sinhala, Tamil, English)
-        keywords = [
-            # English
-            'clinic', 'hospital', 'disease', 'vaccine', 'health', 'medical',
-            'dengue', 'leptospirosis', 'cholera', 'schedule', 'doctor',
-            # Sinhala (romanized for URL matching)
-            'auruwedaya', 'behethshalawa', 'roga', 'ennath',
-            # Common URL patterns
-            'pdf', 'circular', 'advisory', 'report', 'schedule'
-        ]
-        
         url_lower = url.lower()
         text_lower = text.lower()
         
         score = 0.0
-        for keyword in keywords:
+        for keyword in LINK_KEYWORDS:
             if keyword in url_lower:
                 score += 0.15
             if keyword in text_lower:
@@ -388,6 +415,52 @@ class AdaptiveCrawlerAgent:
             score -= 0.2
         
         return min(max(score, 0.0), 1.0)
+    
+    def score_links_batch(self, urls: List[str], texts: Optional[List[str]] = None) -> List[float]:
+        """
+        Batch form of score_link_relevance (same heuristic, one score per URL)
+        
+        Keyword hits become a boolean (links x keywords) matrix scored with a
+        single matrix-vector product when NumPy is installed.
+        
+        Args:
+            urls: URLs to score
+            texts: Anchor texts, parallel to `urls` (empty if omitted)
+            
+        Returns:
+            Relevance scores (0.0 - 1.0), parallel to `urls`
+        """
+        if texts is None:
+            texts = [''] * len(urls)
+        
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.score_link_relevance(url, text) for url, text in zip(urls, texts)]
+        
+        if not urls:
+            return []
+        
+        urls_lower = [url.lower() for url in urls]
+        texts_lower = [text.lower() for text in texts]
+        n = len(urls_lower)
+        
+        def hits(haystacks: List[str]) -> "np.ndarray":
+            return np.array(
+                [np.fromiter((k in h for h in haystacks), dtype=bool, count=n) for k in LINK_KEYWORDS],
+                dtype=np.float64,
+            ).T
+        
+        scores = hits(urls_lower) @ np.full(len(LINK_KEYWORDS), 0.15)
+        if any(texts_lower):
+            scores += hits(texts_lower) @ np.full(len(LINK_KEYWORDS), 0.10)
+        
+        gov = np.fromiter(('gov.lk' in u for u in urls_lower), dtype=bool, count=n)
+        http = np.fromiter((u.startswith('http') for u in urls_lower), dtype=bool, count=n)
+        # Boost government domains, penalize external links
+        scores += np.where(gov, 0.3, 0.0) - np.where(http & ~gov, 0.2, 0.0)
+        
+        return np.clip(scores, 0.0, 1.0).tolist()
 
 
 # Example usage
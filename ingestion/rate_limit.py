@@ -0,0 +1,42 @@
+"""Per-domain request rate limiting for the crawler."""
+
+import asyncio
+import time
+
+
+class DomainTokenBucket:
+    """
+    Token bucket for one domain: `1 / rate_limit_delay` requests per second,
+    bursting up to `capacity`.
+    
+    Waiters for the same domain queue on a lock, so each gets its own token;
+    other domains have their own buckets and never wait on this one.
+    """
+    
+    def __init__(self, rate_limit_delay: float, capacity: float = 1.0):
+        self.rate = 1.0 / rate_limit_delay if rate_limit_delay > 0 else float('inf')
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
+    async def acquire(self) -> float:
+        """
+        Take one token, sleeping until it is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        async with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0
+            if self.tokens < 1.0:
+                wait = (1.0 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+                self._refill(time.monotonic())
+            self.tokens = max(self.tokens - 1.0, 0.0)
+            return wait
@@ -5,6 +5,7 @@ can stay testable (unit tests can inject fakes for this interface).
 
 Expected Supabase tables (recommended minimal schema):
 - crawl_queue
+- crawl_sources
 - raw_ingest
 - ocr_queue
 - audit_logs
@@ -17,9 +18,11 @@ Storage:
 
 from __future__ import annotations
 
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from pathlib import PurePosixPath
+from typing import IO, Any, Dict, List, Optional
 from uuid import uuid4
 
 from supabase_setup import get_supabase, get_storage_bucket
@@ -29,6 +32,33 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def is_unique_violation(exc: BaseException) -> bool:
+    """True if a PostgREST error is a Postgres unique_violation (SQLSTATE 23505)."""
+    return str(getattr(exc, "code", "")) == "23505"
+
+
+def is_missing_function(exc: BaseException) -> bool:
+    """True if an RPC failed because the Postgres function isn't installed.
+
+    PostgREST reports PGRST202 when the function is absent from its schema
+    cache; Postgres itself raises undefined_function (42883).
+    """
+    return str(getattr(exc, "code", "")) in ("PGRST202", "42883")
+
+
+def is_transport_error(exc: BaseException) -> bool:
+    """True if a request failed in transit (connect, read, timeout) rather than in Postgres.
+
+    The statement may still have committed, so only idempotent writes
+    should be retried on these.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return isinstance(exc, (ConnectionError, TimeoutError))
+    return isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
 @dataclass
 class SupabaseRepo:
     supabase: Any
@@ -53,6 +83,28 @@ class SupabaseRepo:
     def download_bytes(self, path: str) -> bytes:
         return self.supabase.storage.from_(self.storage_bucket).download(path)
 
+    def download_stream(self, path: str, chunk_size: int = 1 << 16) -> IO[bytes]:
+        """Stream an object into a named temporary file and return it rewound.
+
+        Large assets go to disk chunk by chunk instead of being held in memory
+        whole; closing the file deletes it.
+        """
+        import httpx
+
+        signed = self.supabase.storage.from_(self.storage_bucket).create_signed_url(path, 60)
+        url = signed.get("signedURL") or signed.get("signedUrl")
+        f = tempfile.NamedTemporaryFile(suffix=PurePosixPath(path).suffix)
+        try:
+            with httpx.stream("GET", url, timeout=60.0) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_bytes(chunk_size):
+                    f.write(chunk)
+            f.seek(0)
+        except BaseException:
+            f.close()
+            raise
+        return f
+
     # -------------------------
     # raw_ingest
     # -------------------------
@@ -86,6 +138,13 @@ class SupabaseRepo:
             return data[0]
         return None
 
+    def get_raw_ingest_many(self, context_ids: List[str], columns: str = "*") -> Dict[str, Dict[str, Any]]:
+        """Fetch several raw_ingest rows in one request, keyed by id."""
+        if not context_ids:
+            return {}
+        resp = self.supabase.table("raw_ingest").select(columns).in_("id", list(context_ids)).execute()
+        return {row["id"]: row for row in (getattr(resp, "data", None) or [])}
+
     def get_raw_ingest_assets(self, context_id: str) -> Dict[str, Any]:
         row = self.get_raw_ingest(context_id, columns="assets")
         if not row:
@@ -103,11 +162,44 @@ class SupabaseRepo:
             {"assets": assets, "asset_counts": asset_counts}
         ).eq("id", context_id).execute()
 
+    def update_raw_ingest_assets_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Set assets/asset_counts on several existing rows in one request.
+
+        Each row is {"id", "assets", "asset_counts"}; the upsert only touches
+        those columns on conflict.
+        """
+        if rows:
+            self.supabase.table("raw_ingest").upsert(rows, on_conflict="id").execute()
+
     def update_raw_ingest_ocr(self, context_id: str, processing_status: Dict[str, Any], ocr: Dict[str, Any]) -> None:
         self.supabase.table("raw_ingest").update(
             {"processing_status": processing_status, "ocr": ocr}
         ).eq("id", context_id).execute()
 
+    def finalize_ocr(
+        self,
+        queue_id: str,
+        context_id: str,
+        queue_patch: Dict[str, Any],
+        processing_status_patch: Dict[str, Any],
+        ocr: Dict[str, Any],
+    ) -> None:
+        """Record an OCR result on raw_ingest and ocr_queue in one statement (migration 005).
+
+        `processing_status_patch` is merged into the stored processing_status
+        server-side, so no get_raw_ingest_processing_status read is needed.
+        """
+        self.supabase.rpc(
+            "finalize_ocr",
+            {
+                "queue_id": queue_id,
+                "context_id": context_id,
+                "patch": queue_patch,
+                "ps": processing_status_patch,
+                "ocr": ocr,
+            },
+        ).execute()
+
     # -------------------------
     # audit_logs
     # -------------------------
@@ -138,6 +230,17 @@ class SupabaseRepo:
         )
         return bool(getattr(resp, "data", None))
 
+    def upsert_crawl_source(self, source: Dict[str, Any]) -> str:
+        """Insert a content-addressed crawl_sources row unless it exists; returns its id (migration 003)."""
+        self.supabase.table("crawl_sources").upsert(source, on_conflict="id", ignore_duplicates=True).execute()
+        return str(source["id"])
+
+    def get_crawl_sources(self, source_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not source_ids:
+            return {}
+        resp = self.supabase.table("crawl_sources").select("*").in_("id", list(source_ids)).execute()
+        return {str(row["id"]): row for row in (getattr(resp, "data", None) or [])}
+
     def insert_crawl_queue(self, entry: Dict[str, Any]) -> str:
         if "id" not in entry:
             entry = {**entry, "id": str(uuid4())}
@@ -151,10 +254,44 @@ class SupabaseRepo:
             return data[0]["id"]
         return entry["id"]
 
-    def select_next_crawl_queue(self, limit: int, now_iso: str, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+    def insert_crawl_queue_if_absent(self, entry: Dict[str, Any]) -> Optional[str]:
+        """Insert a crawl_queue row; None if the URL is already pending.
+
+        Relies on the `crawl_queue_pending_url` unique partial index (migration 002),
+        so the duplicate check and the insert are one race-free round-trip.
+        """
+        try:
+            return self.insert_crawl_queue(entry)
+        except Exception as e:
+            if is_unique_violation(e):
+                return None
+            raise
+
+    def bulk_insert_crawl_queue(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """Insert many crawl_queue rows in a single request; returns ids in input order.
+
+        Rows whose id already exists are skipped, so resending the same
+        rows after a lost response is safe. A URL that is already pending
+        still fails with unique_violation.
+        """
+        if not entries:
+            return []
+
+        now_iso = utc_now_iso()
+        rows = [
+            {**entry, "id": entry.get("id") or str(uuid4()), "created_at": entry.get("created_at") or now_iso}
+            for entry in entries
+        ]
+
+        self.supabase.table("crawl_queue").upsert(rows, on_conflict="id", ignore_duplicates=True).execute()
+        return [row["id"] for row in rows]
+
+    def select_next_crawl_queue(
+        self, limit: int, now_iso: str, domain: Optional[str] = None, columns: str = "*"
+    ) -> List[Dict[str, Any]]:
         q = (
             self.supabase.table("crawl_queue")
-            .select("*")
+            .select(columns)
             .eq("status", "pending")
             .lte("scheduled_time", now_iso)
             .order("priority_score", desc=True)
@@ -165,9 +302,47 @@ class SupabaseRepo:
         resp = q.execute()
         return list(getattr(resp, "data", None) or [])
 
+    def claim_crawl_queue(self, limit: int, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Atomically mark up to `limit` due rows as processing and return them (migration 002)."""
+        resp = self.supabase.rpc("claim_crawl_urls", {"lim": limit, "domain_filter": domain}).execute()
+        return list(getattr(resp, "data", None) or [])
+
+    def mark_crawl_queue_processing(self, queue_id: str) -> bool:
+        """Set status=processing and bump attempts in one statement; False if no such row."""
+        resp = self.supabase.rpc("crawl_queue_mark_processing", {"queue_id": queue_id}).execute()
+        return bool(getattr(resp, "data", None))
+
+    def mark_crawl_queue_failed(self, queue_id: str, error: str, retry: bool = True) -> Optional[str]:
+        """Record a failed attempt server-side; returns the new status or None if no such row."""
+        resp = self.supabase.rpc(
+            "crawl_queue_mark_failed", {"queue_id": queue_id, "err": error, "retry": retry}
+        ).execute()
+        data = getattr(resp, "data", None)
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if isinstance(data, dict):
+            data = data.get("crawl_queue_mark_failed")
+        return data or None
+
     def update_crawl_queue(self, queue_id: str, patch: Dict[str, Any]) -> None:
         self.supabase.table("crawl_queue").update(patch).eq("id", queue_id).execute()
 
+    def mark_crawl_queue_many(self, transitions: List[Dict[str, Any]]) -> int:
+        """Apply [{id, status, context_id}] transitions in one statement; returns rows updated (migration 002)."""
+        resp = self.supabase.rpc("crawl_queue_mark_many", {"items": transitions}).execute()
+        return int(getattr(resp, "data", None) or 0)
+
+    def delete_old_crawl_queue(self, cutoff_iso: str, limit: int) -> int:
+        """Delete up to `limit` finished rows older than the cutoff; returns the count (migration 002)."""
+        resp = self.supabase.rpc("delete_old_crawl_queue", {"cutoff": cutoff_iso, "lim": limit}).execute()
+        return int(getattr(resp, "data", None) or 0)
+
+    def crawl_queue_status_counts(self) -> Dict[str, int]:
+        """Row counts per status via the `crawl_queue_stats` RPC (migration 002)."""
+        resp = self.supabase.rpc("crawl_queue_stats").execute()
+        rows = getattr(resp, "data", None) or []
+        return {row["status"]: int(row.get("c") or 0) for row in rows if row.get("status")}
+
     # -------------------------
     # ocr_queue
     # -------------------------
@@ -300,9 +475,10 @@ class SupabaseRepo:
         limit: int = 100,
         language: Optional[str] = None,
         domain: Optional[str] = None,
-        verified_only: bool = False
+        verified_only: bool = False,
+        unverified_only: bool = False
     ) -> List[Dict[str, Any]]:
-        """Get Q&A pairs with optional filters."""
+        """Get Q&A pairs with optional filters, newest first."""
         q = self.supabase.table("qa_pairs").select("*").limit(limit)
         if language:
             q = q.eq("question_language", language)
@@ -310,6 +486,8 @@ class SupabaseRepo:
             q = q.eq("domain", domain)
         if verified_only:
             q = q.eq("verified", True)
+        if unverified_only:
+            q = q.eq("verified", False)
         
         resp = q.order("created_at", desc=True).execute()
         return list(getattr(resp, "data", None) or [])
@@ -3,16 +3,125 @@ URL Manager
 Manages crawl queue with priority scoring and scheduling
 """
 
+import hashlib
+import json
+import os
+import re
 import time
-from typing import Dict, List, Optional, Any
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
+from uuid import uuid4
 import logging
 
-from ingestion.supabase_repo import SupabaseRepo, utc_now_iso
+from ingestion.supabase_repo import (
+    SupabaseRepo,
+    is_missing_function,
+    is_transport_error,
+    is_unique_violation,
+    utc_now_iso,
+)
+
+try:
+    # Optional: faster row sizing for add_url_batch chunking
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Authority of an http(s) URL; anything else goes through urlparse
+_NETLOC_RE = re.compile(r'^https?://([^/?#]+)', re.I)
+
+
+@lru_cache(maxsize=4096)
+def _netloc(url: str) -> str:
+    """Lower-cased netloc of `url`, cached; queue inserts see the same URLs repeatedly."""
+    m = _NETLOC_RE.match(url)
+    if m:
+        return m.group(1).lower()
+    return urlparse(url).netloc.lower()
+
+
+def _insert_workers() -> int:
+    """Number of concurrent chunk inserts (CRAWL_QUEUE_INSERT_WORKERS, default 10)."""
+    try:
+        return max(1, int(os.getenv('CRAWL_QUEUE_INSERT_WORKERS', '10')))
+    except ValueError:
+        return 10
+
+
+def _json_size(row: Dict[str, Any]) -> int:
+    """Approximate request-body bytes for `row` (orjson when installed)."""
+    if _orjson is not None:
+        return len(_orjson.dumps(row, default=str))
+    return len(json.dumps(row, default=str))
+
+
+def _with_retry(fn: Callable[..., T], *args: Any, attempts: int = 3, base_delay: float = 0.5) -> T:
+    """Call fn(*args), retrying transport errors with exponential backoff.
+
+    fn must be idempotent: a timed-out attempt may have committed.
+    """
+    for attempt in range(attempts - 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if not is_transport_error(e):
+                raise
+            delay = base_delay * (2 ** attempt)
+            logger.warning(f"Retrying after error (attempt {attempt + 1}/{attempts}, {delay:.1f}s): {e}")
+            time.sleep(delay)
+    return fn(*args)
+
+
+@dataclass(slots=True)
+class QueueEntry:
+    """A crawl_queue row before insert; slotted since batches build one per URL."""
+    url: str
+    domain: str
+    source_agency: str
+    priority: str
+    priority_score: float
+    scheduled_time: str
+    created_at: str
+    status: str = 'pending'
+    attempts: int = 0
+    max_attempts: int = 3
+    last_error: Optional[str] = None
+    id: Optional[str] = None
+    source_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a crawl_queue row; unset id/source_id/metadata are left to the database."""
+        row = {
+            'url': self.url,
+            'domain': self.domain,
+            'source_agency': self.source_agency,
+            'priority': self.priority,
+            'priority_score': self.priority_score,
+            'status': self.status,
+            'scheduled_time': self.scheduled_time,
+            'created_at': self.created_at,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+        }
+        if self.id is not None:
+            row['id'] = self.id
+        if self.source_id is not None:
+            row['source_id'] = self.source_id
+        if self.metadata is not None:
+            row['metadata'] = self.metadata
+        return row
+
 
 class URLManager:
     """
@@ -35,25 +144,70 @@ class URLManager:
         'gov.lk': 0.85,
         'other': 0.70
     }
+
+    # Host suffix -> reliability; matched label-wise so 'gov.lk' never matches 'notgov.lk'
+    _RELIABILITY_SUFFIX = {
+        source: reliability
+        for source, reliability in SOURCE_RELIABILITY.items()
+        if source != 'other'
+    }
+
+    # Rows and approximate JSON bytes per bulk insert request; the byte cap
+    # stays under PostgREST's request body limit when metadata is large
+    INSERT_BATCH_SIZE = 500
+    INSERT_BATCH_BYTES = 8_000_000
     
+    # First backoff before resending a chunk after a transport error
+    INSERT_RETRY_DELAY = 0.5
+
+    # Rows per delete_old_crawl_queue call
+    CLEAN_BATCH_SIZE = 5000
+
+    # Upper bound on mark_failed's exponential retry backoff
+    MAX_RETRY_DELAY_MINUTES = 60
+
     def __init__(self, repo: Optional[SupabaseRepo] = None):
         """Initialize URL manager."""
         self.repo = repo or SupabaseRepo.from_env()
+        # crawl_sources id -> source_config, for rows known to be stored
+        self._source_configs: Dict[str, Dict[str, Any]] = {}
+        # Migration functions this database turned out not to have
+        self._missing_rpcs: set = set()
         logger.info("URLManager initialized")
 
+    def _rpc_missing(self, name: str, exc: BaseException) -> bool:
+        """True if `exc` says function `name` isn't installed; remembered so it isn't called again."""
+        if not is_missing_function(exc):
+            return False
+        logger.warning(f"{name} function not installed (see migrations/), using table queries: {exc}")
+        self._missing_rpcs.add(name)
+        return True
+
     @staticmethod
     def _to_utc_iso(dt: datetime) -> str:
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
         return dt.astimezone(timezone.utc).isoformat()
     
+    @classmethod
+    def _source_reliability(cls, domain: str) -> float:
+        """Reliability of the longest known suffix of `domain` (O(labels))."""
+        host = domain.rsplit('@', 1)[-1].split(':', 1)[0].lower()
+        parts = host.split('.')
+        for i in range(len(parts)):
+            reliability = cls._RELIABILITY_SUFFIX.get('.'.join(parts[i:]))
+            if reliability is not None:
+                return reliability
+        return cls.SOURCE_RELIABILITY['other']
+    
     def calculate_priority_score(
         self,
         url: str,
         source_reliability: Optional[float] = None,
         priority_level: str = 'medium',
         freshness_days: int = 0,
-        user_demand: float = 0.0
+        user_demand: float = 0.0,
+        domain: Optional[str] = None
     ) -> float:
         """
         Calculate priority score for URL
@@ -64,22 +218,35 @@ class URLManager:
             priority_level: Priority level ('critical', 'high', 'medium', 'low')
             freshness_days: Days since last crawl
             user_demand: User demand score (0-1)
+            domain: Pre-parsed netloc of `url` (parsed here if omitted)
             
         Returns:
             Priority score (0-1)
         """
+        if domain is None:
+            domain = _netloc(url)
+        # Quantize demand so near-identical requests share a cache entry
+        return self._score_cached(
+            domain, source_reliability, priority_level, freshness_days, round(user_demand, 2)
+        )
+
+    @classmethod
+    @lru_cache(maxsize=8192)
+    def _score_cached(
+        cls,
+        domain: str,
+        source_reliability: Optional[float],
+        priority_level: str,
+        freshness_days: int,
+        user_demand: float
+    ) -> float:
+        """Pure scoring body of calculate_priority_score, memoized per input tuple."""
         # Base priority from level
-        base_score = self.PRIORITY_WEIGHTS.get(priority_level, 0.5)
+        base_score = cls.PRIORITY_WEIGHTS.get(priority_level, 0.5)
         
         # Source reliability
-        domain = urlparse(url).netloc
         if source_reliability is None:
-            for source, reliability in self.SOURCE_RELIABILITY.items():
-                if source in domain:
-                    source_reliability = reliability
-                    break
-            else:
-                source_reliability = 0.70
+            source_reliability = cls._source_reliability(domain)
         
         # Freshness bonus (older content gets higher priority for refresh)
         freshness_score = min(freshness_days / 30.0, 1.0) * 0.3
@@ -96,7 +263,97 @@ class URLManager:
         )
         
         return min(max(final_score, 0.0), 1.0)
+
+    def calculate_priority_scores(
+        self,
+        urls: List[str],
+        priority_level: str = 'medium',
+        freshness_days: int = 0,
+        user_demand: float = 0.0,
+        domains: Optional[List[str]] = None
+    ) -> List[float]:
+        """
+        Batch form of calculate_priority_score (same formula, one score per URL)
+        
+        Reliability is resolved per URL; the arithmetic runs once over NumPy
+        arrays when NumPy is installed, otherwise per URL in Python.
+        
+        Args:
+            urls: URLs to score
+            priority_level: Priority level applied to every URL
+            freshness_days: Days since last crawl
+            user_demand: User demand score (0-1)
+            domains: Pre-parsed netlocs, parallel to `urls`
+            
+        Returns:
+            Priority scores (0-1), parallel to `urls`
+        """
+        if domains is None:
+            domains = [_netloc(url) for url in urls]
+        reliabilities = [self._source_reliability(domain) for domain in domains]
+
+        base_score = self.PRIORITY_WEIGHTS.get(priority_level, 0.5)
+        # Everything except reliability is shared by the batch
+        shared = base_score * 0.4 + min(freshness_days / 30.0, 1.0) * 0.3 + round(user_demand, 2) * 0.2
+
+        try:
+            import numpy as np
+        except ImportError:
+            return [min(max(shared + rel * 0.3, 0.0), 1.0) for rel in reliabilities]
+
+        scores = np.clip(shared + np.asarray(reliabilities, dtype=np.float64) * 0.3, 0.0, 1.0)
+        return scores.tolist()
     
+    def _source_fields(self, source_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue-row fields that carry the source configuration
+        
+        The config is stored once in crawl_sources (migration 003), keyed by
+        the hash of its content, and rows reference it by id; without an
+        agency or the table, it is inlined.
+        """
+        agency = source_config.get('agency')
+        if not agency:
+            return {'metadata': source_config}
+
+        canonical = json.dumps(source_config, sort_keys=True, default=str, separators=(',', ':'))
+        source_id = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        if source_id in self._source_configs:
+            return {'source_id': source_id}
+
+        try:
+            self.repo.upsert_crawl_source({
+                'id': source_id,
+                'agency': agency,
+                'reliability': source_config.get('reliability'),
+                'user_demand': source_config.get('user_demand'),
+                'metadata': source_config,
+            })
+        except Exception as e:
+            logger.warning(f"crawl_sources unavailable, storing source config inline: {e}")
+            return {'metadata': source_config}
+
+        self._source_configs[source_id] = dict(source_config)
+        return {'source_id': source_id}
+
+    def _attach_sources(self, rows: List[Dict[str, Any]]) -> None:
+        """Fill `metadata` on rows that reference crawl_sources, one lookup for unknown ids."""
+        missing = {
+            row['source_id'] for row in rows
+            if row.get('source_id') and not row.get('metadata')
+            and row['source_id'] not in self._source_configs
+        }
+        if missing:
+            try:
+                for source_id, source in self.repo.get_crawl_sources(sorted(missing)).items():
+                    self._source_configs[source_id] = source.get('metadata') or {}
+            except Exception as e:
+                logger.warning(f"Failed to load crawl sources: {e}")
+
+        for row in rows:
+            if row.get('source_id') and not row.get('metadata'):
+                row['metadata'] = self._source_configs.get(row['source_id'], {})
+
     def add_url(
         self,
         url: str,
@@ -116,37 +373,34 @@ class URLManager:
         Returns:
             Queue entry document ID or None if already exists
         """
+        domain = _netloc(url)
+
         # Calculate priority score
         priority_score = self.calculate_priority_score(
             url=url,
             source_reliability=source_config.get('reliability'),
             priority_level=priority,
             freshness_days=0,
-            user_demand=source_config.get('user_demand', 0.0)
+            user_demand=source_config.get('user_demand', 0.0),
+            domain=domain
         )
         
-        queue_entry = {
-            'url': url,
-            'domain': urlparse(url).netloc,
-            'source_agency': source_config.get('agency', 'Unknown'),
-            'priority': priority,
-            'priority_score': priority_score,
-            'status': 'pending',
-            'scheduled_time': self._to_utc_iso(scheduled_time or datetime.utcnow()),
-            'created_at': utc_now_iso(),
-            'attempts': 0,
-            'max_attempts': 3,
-            'last_error': None,
-            'metadata': source_config
-        }
+        queue_entry = QueueEntry(
+            url=url,
+            domain=domain,
+            source_agency=source_config.get('agency', 'Unknown'),
+            priority=priority,
+            priority_score=priority_score,
+            scheduled_time=self._to_utc_iso(scheduled_time or datetime.utcnow()),
+            created_at=utc_now_iso(),
+            **self._source_fields(source_config)
+        )
         
-        # Check if URL already exists
-        if self.repo.crawl_queue_exists_pending(url):
+        queue_id = self.repo.insert_crawl_queue_if_absent(queue_entry.to_dict())
+        if queue_id is None:
             logger.info(f"URL already in queue: {url}")
             return None
         
-        queue_id = self.repo.insert_crawl_queue(queue_entry)
-        
         logger.info(f"✓ Added to queue: {url} (score: {priority_score:.2f})")
         return queue_id
     
@@ -167,59 +421,168 @@ class URLManager:
         Returns:
             List of created document IDs
         """
-        doc_ids = []
-        
-        for url in urls:
-            priority_score = self.calculate_priority_score(
+        domains = [_netloc(url) for url in urls]
+        # With a fixed level and no freshness/demand signal the score depends
+        # only on the host, so score each distinct host once (usually just one).
+        hosts = list(dict.fromkeys(domains))
+        score_by_host = dict(zip(
+            hosts, self.calculate_priority_scores(hosts, priority_level=priority, domains=hosts)
+        ))
+        scores = [score_by_host[domain] for domain in domains]
+
+        # All rows in a batch share their insert/schedule time and source reference
+        source_fields = self._source_fields(source_config) if urls else {}
+        now_iso = utc_now_iso()
+        scheduled_iso = self._to_utc_iso(datetime.utcnow())
+
+        source_agency = source_config.get('agency', 'Unknown')
+        entries = [
+            QueueEntry(
+                id=str(uuid4()),
                 url=url,
-                priority_level=priority
+                domain=domain,
+                source_agency=source_agency,
+                priority=priority,
+                priority_score=priority_score,
+                scheduled_time=scheduled_iso,
+                created_at=now_iso,
+                **source_fields
             )
-            
-            queue_entry = {
-                'url': url,
-                'domain': urlparse(url).netloc,
-                'source_agency': source_config.get('agency', 'Unknown'),
-                'priority': priority,
-                'priority_score': priority_score,
-                'status': 'pending',
-                'scheduled_time': self._to_utc_iso(datetime.utcnow()),
-                'created_at': utc_now_iso(),
-                'attempts': 0,
-                'max_attempts': 3,
-                'metadata': source_config
-            }
+            for url, domain, priority_score in zip(urls, domains, scores)
+        ]
 
-            doc_ids.append(self.repo.insert_crawl_queue(queue_entry))
+        # Chunks are independent; overlap their round-trips and keep result
+        # order. At most `workers` chunks are submitted at a time, so only
+        # those exist as row dicts.
+        doc_ids: List[str] = []
+        if entries:
+            workers = _insert_workers()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                in_flight: deque = deque()
+                for chunk in self._chunk_rows(entries):
+                    if len(in_flight) >= workers:
+                        doc_ids.extend(in_flight.popleft().result())
+                    in_flight.append(
+                        executor.submit(_with_retry, self._insert_chunk, chunk, base_delay=self.INSERT_RETRY_DELAY)
+                    )
+                while in_flight:
+                    doc_ids.extend(in_flight.popleft().result())
         
         logger.info(f"✓ Added {len(urls)} URLs to queue")
         return doc_ids
     
+    def _chunk_rows(self, entries: List[QueueEntry]) -> Iterator[List[Dict[str, Any]]]:
+        """Yield insert chunks of row dicts, bounded by row count and payload size.
+
+        Each row is built once, lazily, and sized from the dict that is sent.
+        """
+        chunk: List[Dict[str, Any]] = []
+        chunk_bytes = 0
+        for entry in entries:
+            row = entry.to_dict()
+            size = _json_size(row)
+            if chunk and (len(chunk) >= self.INSERT_BATCH_SIZE or chunk_bytes + size > self.INSERT_BATCH_BYTES):
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append(row)
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    def _insert_chunk(self, chunk: List[Dict[str, Any]]) -> List[str]:
+        try:
+            return self.repo.bulk_insert_crawl_queue(chunk)
+        except Exception as e:
+            if not is_unique_violation(e):
+                raise
+            # Some URLs are already pending; the whole statement was rejected,
+            # so insert row by row and skip the duplicates.
+            ids = [self.repo.insert_crawl_queue_if_absent(entry) for entry in chunk]
+            return [doc_id for doc_id in ids if doc_id]
+    
     def get_next_urls(
         self,
         limit: int = 10,
-        domain_filter: Optional[str] = None
+        domain_filter: Optional[str] = None,
+        columns: str = '*'
     ) -> List[Dict[str, Any]]:
         """
         Get next URLs to crawl based on priority
         
+        A read-only peek: the rows stay pending. Dispatch uses
+        claim_next_urls.
+        
         Args:
             limit: Maximum URLs to return
             domain_filter: Filter by specific domain
+            columns: Comma-separated crawl_queue columns to fetch (e.g. 'id,url')
             
         Returns:
             List of queue entries
         """
-        rows = self.repo.select_next_crawl_queue(limit=limit, now_iso=utc_now_iso(), domain=domain_filter)
+        if columns != '*':
+            # Every entry carries doc_id
+            wanted = [c.strip() for c in columns.split(',') if c.strip()]
+            columns = ','.join(dict.fromkeys(['id', *wanted]))
+        
+        rows = self.repo.select_next_crawl_queue(
+            limit=limit,
+            now_iso=utc_now_iso(),
+            domain=domain_filter,
+            columns=columns,
+        )
 
         urls = []
         for row in rows:
             data = dict(row)
             data['doc_id'] = data.get('id')
             urls.append(data)
+        self._attach_sources(urls)
         
         logger.info(f"Retrieved {len(urls)} URLs from queue")
         return urls
     
+    def claim_next_urls(
+        self,
+        limit: int = 10,
+        domain_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Claim the next URLs to crawl, already marked as processing
+        
+        Unlike get_next_urls, concurrent dispatchers never receive the same
+        entry: selection and the status update happen in one statement.
+        
+        Args:
+            limit: Maximum URLs to claim
+            domain_filter: Filter by specific domain
+            
+        Returns:
+            List of queue entries, highest priority first
+        """
+        rows = None
+        if 'claim_crawl_urls' not in self._missing_rpcs:
+            try:
+                rows = self.repo.claim_crawl_queue(limit=limit, domain=domain_filter)
+            except Exception as e:
+                # Any other failure is raised: the fallback below is not atomic
+                if not self._rpc_missing('claim_crawl_urls', e):
+                    raise
+        if rows is None:
+            # Without migration 002 (no SKIP LOCKED), select then mark
+            rows = self.repo.select_next_crawl_queue(limit=limit, now_iso=utc_now_iso(), domain=domain_filter)
+            rows = [row for row in rows if self.mark_processing(row.get('id'))]
+
+        urls = []
+        for row in sorted(rows, key=lambda r: -float(r.get('priority_score') or 0.0)):
+            data = dict(row)
+            data['doc_id'] = data.get('id')
+            urls.append(data)
+        self._attach_sources(urls)
+
+        logger.info(f"Claimed {len(urls)} URLs from queue")
+        return urls
+    
     def mark_processing(self, doc_id: str) -> bool:
         """
         Mark URL as being processed
@@ -231,6 +594,15 @@ class URLManager:
             True if successful
         """
         try:
+            if 'crawl_queue_mark_processing' not in self._missing_rpcs:
+                try:
+                    # Status + attempt increment in one UPDATE (migration 002)
+                    return self.repo.mark_crawl_queue_processing(doc_id)
+                except Exception as e:
+                    # Other errors may hide a committed increment; don't write again
+                    if not self._rpc_missing('crawl_queue_mark_processing', e):
+                        raise
+
             # best-effort attempt increment
             current = self.repo.supabase.table('crawl_queue').select('attempts').eq('id', doc_id).limit(1).execute()
             attempts = 0
@@ -277,6 +649,51 @@ class URLManager:
             logger.error(f"Failed to mark completed: {str(e)}")
             return False
     
+    def mark_many(self, transitions: List[Dict[str, Any]]) -> int:
+        """
+        Apply several status transitions in one round-trip
+        
+        Retries with backoff still go through mark_failed, which computes
+        each entry's schedule.
+        
+        Args:
+            transitions: Dicts with 'doc_id', 'status' and optional 'context_id'
+            
+        Returns:
+            Number of entries updated
+        """
+        if not transitions:
+            return 0
+        
+        rows = [
+            {'id': t['doc_id'], 'status': t['status'], 'context_id': t.get('context_id')}
+            for t in transitions
+        ]
+        if 'crawl_queue_mark_many' not in self._missing_rpcs:
+            try:
+                updated = self.repo.mark_crawl_queue_many(rows)
+                logger.info(f"✓ Marked {updated} entries")
+                return updated
+            except Exception as e:
+                if not self._rpc_missing('crawl_queue_mark_many', e):
+                    # The update may have committed; callers decide whether to redo it
+                    logger.error(f"Failed to mark {len(rows)} entries: {str(e)}")
+                    return 0
+        
+        updated = 0
+        for row in rows:
+            patch: Dict[str, Any] = {'status': row['status']}
+            if row['status'] == 'completed':
+                patch['completed_at'] = utc_now_iso()
+            if row['context_id']:
+                patch['context_id'] = row['context_id']
+            try:
+                self.repo.update_crawl_queue(row['id'], patch)
+                updated += 1
+            except Exception as e:
+                logger.error(f"Failed to mark {row['id']} {row['status']}: {str(e)}")
+        return updated
+    
     def mark_failed(
         self,
         doc_id: str,
@@ -295,6 +712,25 @@ class URLManager:
             True if successful
         """
         try:
+            if 'crawl_queue_mark_failed' not in self._missing_rpcs:
+                try:
+                    # Attempts, backoff and final status computed in one UPDATE (migration 002)
+                    status = self.repo.mark_crawl_queue_failed(doc_id, error_message, retry)
+                    if status is None:
+                        return False
+                    if status == 'pending':
+                        logger.info(f"Retrying {doc_id} later")
+                    else:
+                        logger.error(f"Failed permanently: {doc_id}")
+                    return True
+                except Exception as e:
+                    if is_unique_violation(e):
+                        # The URL was re-queued between the function's check and its update
+                        return self._fail_superseded(doc_id, error_message)
+                    # Other errors may hide a committed attempt; don't count it twice
+                    if not self._rpc_missing('crawl_queue_mark_failed', e):
+                        raise
+
             current = self.repo.supabase.table('crawl_queue').select('attempts,max_attempts').eq('id', doc_id).limit(1).execute()
             rows = getattr(current, 'data', None) or []
             if not rows:
@@ -310,22 +746,55 @@ class URLManager:
             }
             
             if retry and attempts < max_attempts:
-                # Exponential backoff for retry
-                retry_delay = timedelta(minutes=2 ** attempts)
+                # Exponential backoff for retry, capped at MAX_RETRY_DELAY_MINUTES
+                retry_delay = timedelta(minutes=min(1 << attempts, self.MAX_RETRY_DELAY_MINUTES))
                 update_data['status'] = 'pending'
                 update_data['scheduled_time'] = self._to_utc_iso(datetime.utcnow() + retry_delay)
-                logger.info(f"Retrying {doc_id} in {retry_delay}")
             else:
                 update_data['status'] = 'failed'
-                logger.error(f"Failed permanently: {doc_id}")
 
-            self.repo.update_crawl_queue(doc_id, update_data)
+            try:
+                self.repo.update_crawl_queue(doc_id, update_data)
+            except Exception as e:
+                if not is_unique_violation(e):
+                    raise
+                return self._fail_superseded(doc_id, error_message)
+            if update_data['status'] == 'pending':
+                logger.info(f"Retrying {doc_id} in {retry_delay}")
+            else:
+                logger.error(f"Failed permanently: {doc_id}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to mark failed: {str(e)}")
             return False
     
+    def _fail_superseded(self, doc_id: str, error_message: str) -> bool:
+        """Fail `doc_id` outright; its URL is pending again under another row."""
+        self.repo.update_crawl_queue(
+            doc_id,
+            {
+                'status': 'failed',
+                'last_error': error_message,
+                'last_attempt_at': utc_now_iso(),
+            },
+        )
+        logger.info(f"Not retrying {doc_id}: its URL is already queued again")
+        return True
+    
+    def _count_status(self, status: str) -> int:
+        resp = (
+            self.repo.supabase.table('crawl_queue')
+            .select('id', count='exact', head=True)
+            .eq('status', status)
+            .execute()
+        )
+        count_val = getattr(resp, 'count', None)
+        if count_val is None:
+            data = getattr(resp, 'data', None) or []
+            count_val = len(data)
+        return int(count_val)
+
     def get_queue_statistics(self) -> Dict[str, int]:
         """
         Get queue statistics
@@ -341,15 +810,26 @@ class URLManager:
             'total': 0
         }
         
+        statuses = ['pending', 'processing', 'completed', 'failed']
+
         try:
-            for status in ['pending', 'processing', 'completed', 'failed']:
-                resp = self.repo.supabase.table('crawl_queue').select('id', count='exact').eq('status', status).execute()
-                count_val = getattr(resp, 'count', None)
-                if count_val is None:
-                    data = getattr(resp, 'data', None) or []
-                    count_val = len(data)
-                stats[status] = int(count_val)
-                stats['total'] += int(count_val)
+            counts = None
+            if 'crawl_queue_stats' not in self._missing_rpcs:
+                try:
+                    # Single GROUP BY round-trip (migration 002)
+                    by_status = self.repo.crawl_queue_status_counts()
+                    counts = [by_status.get(status, 0) for status in statuses]
+                except Exception as e:
+                    if not self._rpc_missing('crawl_queue_stats', e):
+                        raise
+            if counts is None:
+                # Independent HEAD requests: only the count header comes back.
+                with ThreadPoolExecutor(max_workers=len(statuses)) as executor:
+                    counts = list(executor.map(self._count_status, statuses))
+
+            for status, count_val in zip(statuses, counts):
+                stats[status] = count_val
+                stats['total'] += count_val
             
             logger.info(f"Queue stats: {stats}")
             return stats
@@ -370,20 +850,34 @@ class URLManager:
         """
         cutoff = self._to_utc_iso(datetime.utcnow() - timedelta(days=days))
 
-        # Fetch candidates (best-effort). If you need large-scale deletion, use SQL.
+        # Page through the backlog server-side, one bounded DELETE per call.
+        deleted = 0
+        if 'delete_old_crawl_queue' not in self._missing_rpcs:
+            try:
+                while True:
+                    n = self.repo.delete_old_crawl_queue(cutoff, self.CLEAN_BATCH_SIZE)
+                    deleted += n
+                    if n < self.CLEAN_BATCH_SIZE:
+                        break
+                logger.info(f"Cleaned {deleted} old entries")
+                return deleted
+            except Exception as e:
+                # Earlier pages are committed; report them rather than starting over
+                if deleted or not self._rpc_missing('delete_old_crawl_queue', e):
+                    logger.error(f"Cleaning stopped after {deleted} old entries: {e}")
+                    raise
+
+        # One filtered DELETE; ask only for the affected-row count, not the rows.
         resp = (
             self.repo.supabase.table('crawl_queue')
-            .select('id')
+            .delete(count='exact', returning='minimal')
             .in_('status', ['completed', 'failed'])
             .lt('completed_at', cutoff)
-            .limit(1000)
             .execute()
         )
-        rows = list(getattr(resp, 'data', None) or [])
-        deleted = 0
-        for row in rows:
-            self.repo.supabase.table('crawl_queue').delete().eq('id', row['id']).execute()
-            deleted += 1
+        deleted = getattr(resp, 'count', None)
+        if deleted is None:
+            deleted = len(getattr(resp, 'data', None) or [])
 
         logger.info(f"Cleaned {deleted} old entries")
         return deleted
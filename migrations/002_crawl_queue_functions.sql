@@ -0,0 +1,216 @@
+-- Migration 002: crawl_queue server-side functions
+-- Moves queue aggregation and state transitions into Postgres so the
+-- Python side issues one RPC instead of several round-trips.
+
+-- =============================================
+-- 1. Queue statistics
+-- =============================================
+
+-- One GROUP BY instead of one COUNT request per status. The leading
+-- `status` column of idx_crawl_queue_status_priority (migration 001)
+-- already lets Postgres answer this with an index-only scan.
+CREATE OR REPLACE FUNCTION crawl_queue_stats()
+RETURNS TABLE (status TEXT, c BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT q.status, COUNT(*) FROM crawl_queue q GROUP BY q.status
+$$;
+
+-- =============================================
+-- 2. Pending-URL uniqueness
+-- =============================================
+
+-- A URL may be pending at most once. Inserts that collide fail with
+-- unique_violation (23505), which URLManager treats as "already queued",
+-- so no SELECT is needed before the INSERT.
+-- Earlier add_url_batch versions inserted duplicates freely, so first keep
+-- only the highest-priority pending row per URL (oldest id on ties).
+DELETE FROM crawl_queue a
+USING crawl_queue b
+WHERE a.status = 'pending'
+  AND b.status = 'pending'
+  AND a.url = b.url
+  AND a.id <> b.id
+  AND (COALESCE(a.priority_score, 0) < COALESCE(b.priority_score, 0)
+       OR (COALESCE(a.priority_score, 0) = COALESCE(b.priority_score, 0) AND a.id > b.id));
+
+CREATE UNIQUE INDEX IF NOT EXISTS crawl_queue_pending_url
+    ON crawl_queue (url) WHERE status = 'pending';
+
+-- =============================================
+-- 3. Atomic dispatch
+-- =============================================
+
+-- Claim up to `lim` due pending URLs in one statement. SKIP LOCKED lets
+-- concurrent dispatchers claim disjoint rows instead of racing on the
+-- same ones between a SELECT and a separate UPDATE.
+-- First, rows stuck in 'processing' for over an hour (their worker died
+-- before marking them) are rescheduled, or failed once out of attempts.
+-- A row whose URL was queued again meanwhile is failed instead: the other
+-- pending row covers the retry. Each row is handled in its own block, so a
+-- concurrent add_url hitting crawl_queue_pending_url can't abort the claim.
+CREATE OR REPLACE FUNCTION claim_crawl_urls(lim INTEGER, domain_filter TEXT DEFAULT NULL)
+RETURNS SETOF crawl_queue
+LANGUAGE plpgsql AS $$
+DECLARE
+    stale RECORD;
+BEGIN
+    FOR stale IN
+        SELECT c.id, COALESCE(c.attempts, 0) < COALESCE(c.max_attempts, 3) AS retry
+        FROM crawl_queue c
+        WHERE c.status = 'processing'
+          AND c.processing_started_at < NOW() - INTERVAL '1 hour'
+        FOR UPDATE SKIP LOCKED
+    LOOP
+        BEGIN
+            UPDATE crawl_queue
+            SET status = CASE WHEN stale.retry THEN 'pending' ELSE 'failed' END,
+                last_error = 'Processing timed out',
+                last_attempt_at = NOW()
+            WHERE id = stale.id;
+        EXCEPTION WHEN unique_violation THEN
+            UPDATE crawl_queue
+            SET status = 'failed',
+                last_error = 'Processing timed out',
+                last_attempt_at = NOW()
+            WHERE id = stale.id;
+        END;
+    END LOOP;
+
+    RETURN QUERY
+    WITH claimed AS (
+        UPDATE crawl_queue q
+        SET status = 'processing',
+            processing_started_at = NOW(),
+            attempts = COALESCE(q.attempts, 0) + 1
+        WHERE q.id IN (
+            SELECT c.id
+            FROM crawl_queue c
+            WHERE c.status = 'pending'
+              AND c.scheduled_time <= NOW()
+              AND (domain_filter IS NULL OR c.domain = domain_filter)
+            ORDER BY c.priority_score DESC
+            LIMIT lim
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING q.*
+    )
+    SELECT * FROM claimed;
+END;
+$$;
+
+-- =============================================
+-- 4. State transitions
+-- =============================================
+
+-- Attempt counters are incremented in place, so there is no read-back
+-- before the write and no lost update between concurrent workers.
+CREATE OR REPLACE FUNCTION crawl_queue_mark_processing(queue_id TEXT)
+RETURNS BOOLEAN
+LANGUAGE sql AS $$
+    WITH updated AS (
+        UPDATE crawl_queue
+        SET status = 'processing',
+            processing_started_at = NOW(),
+            attempts = COALESCE(attempts, 0) + 1
+        WHERE id = queue_id
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM updated)
+$$;
+
+-- Returns the new status ('pending' when rescheduled, 'failed' when out
+-- of attempts), or NULL if the row does not exist. Backoff is capped at
+-- 60 minutes, matching URLManager.MAX_RETRY_DELAY_MINUTES. SET expressions see
+-- the pre-update `attempts`, hence the explicit + 1.
+-- A row whose URL was queued again while it was processing is failed
+-- rather than rescheduled: the other pending row already covers the
+-- retry, and a second pending row would violate crawl_queue_pending_url.
+CREATE OR REPLACE FUNCTION crawl_queue_mark_failed(queue_id TEXT, err TEXT, retry BOOLEAN DEFAULT TRUE)
+RETURNS TEXT
+LANGUAGE sql AS $$
+    UPDATE crawl_queue q
+    SET attempts = COALESCE(q.attempts, 0) + 1,
+        last_error = err,
+        last_attempt_at = NOW(),
+        status = CASE WHEN r.requeue THEN 'pending' ELSE 'failed' END,
+        scheduled_time = CASE
+            WHEN r.requeue
+                THEN NOW() + INTERVAL '1 minute' * LEAST(POWER(2, COALESCE(q.attempts, 0) + 1), 60)
+            ELSE q.scheduled_time
+        END
+    FROM (
+        SELECT c.id,
+               retry
+               AND COALESCE(c.attempts, 0) + 1 < COALESCE(c.max_attempts, 3)
+               AND NOT EXISTS (
+                   SELECT 1 FROM crawl_queue p
+                   WHERE p.url = c.url AND p.status = 'pending' AND p.id <> c.id
+               ) AS requeue
+        FROM crawl_queue c
+        WHERE c.id = queue_id
+    ) r
+    WHERE q.id = r.id
+    RETURNING q.status
+$$;
+
+-- =============================================
+-- 5. Dispatch index
+-- =============================================
+
+-- Matches the get_next_urls / claim_crawl_urls access path: walk pending rows
+-- in priority order and filter scheduled_time from the index tuple, stopping
+-- at the LIMIT. A leading scheduled_time range would force a sort of every due
+-- row instead. Partial on status = 'pending' so completed and failed rows never
+-- bloat it; url and metadata stay out so the index remains small.
+-- Check with: EXPLAIN ANALYZE SELECT id, url, priority_score FROM crawl_queue
+--   WHERE status = 'pending' AND scheduled_time <= NOW()
+--   ORDER BY priority_score DESC LIMIT 500;
+CREATE INDEX IF NOT EXISTS crawl_queue_dispatch_priority
+    ON crawl_queue (priority_score DESC)
+    INCLUDE (scheduled_time, domain)
+    WHERE status = 'pending';
+
+-- =============================================
+-- 6. Retention
+-- =============================================
+
+-- Delete at most `lim` finished rows older than `cutoff` and return how
+-- many went. Callers loop until fewer than `lim` come back, so each page
+-- is its own short transaction instead of one long lock on a backlog.
+CREATE OR REPLACE FUNCTION delete_old_crawl_queue(cutoff TIMESTAMPTZ, lim INTEGER)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+    WITH d AS (
+        DELETE FROM crawl_queue
+        WHERE id IN (
+            SELECT id FROM crawl_queue
+            WHERE status IN ('completed', 'failed')
+              AND completed_at < cutoff
+            LIMIT lim
+        )
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM d
+$$;
+
+-- =============================================
+-- 7. Batched transitions
+-- =============================================
+
+-- Apply many {id, status, context_id} transitions in one UPDATE. A
+-- PostgREST upsert can't do this: its INSERT half would need every NOT
+-- NULL column (url, ...) even though every row already exists.
+CREATE OR REPLACE FUNCTION crawl_queue_mark_many(items JSONB)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+    WITH updated AS (
+        UPDATE crawl_queue q
+        SET status = v.status,
+            completed_at = CASE WHEN v.status = 'completed' THEN NOW() ELSE q.completed_at END,
+            context_id = COALESCE(v.context_id, q.context_id)
+        FROM jsonb_to_recordset(items) AS v (id TEXT, status TEXT, context_id TEXT)
+        WHERE q.id = v.id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated
+$$;
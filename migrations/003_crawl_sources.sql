@@ -0,0 +1,28 @@
+-- Migration 003: crawl_sources
+-- Stores each source's configuration once; crawl_queue rows reference it
+-- by source_id instead of carrying a copy of the config in `metadata`.
+-- A source's id is the SHA-256 of its canonical config JSON, so each distinct
+-- config gets its own immutable row and rows never overwrite each other.
+
+-- =============================================
+-- 1. Sources table
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS crawl_sources (
+    id TEXT PRIMARY KEY,
+    agency TEXT NOT NULL,
+    reliability DOUBLE PRECISION,
+    user_demand DOUBLE PRECISION,
+    metadata JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_crawl_sources_agency ON crawl_sources (agency);
+
+-- =============================================
+-- 2. Queue reference
+-- =============================================
+
+-- Older rows keep their inline `metadata` and have no source_id.
+ALTER TABLE crawl_queue ADD COLUMN IF NOT EXISTS source_id TEXT REFERENCES crawl_sources (id);
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_source_id ON crawl_queue (source_id);
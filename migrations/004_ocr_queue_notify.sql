@@ -0,0 +1,20 @@
+-- Migration 004: ocr_queue notifications
+-- Lets the OCR worker (run_ocr.py) wait on LISTEN ocr_queue_new instead of
+-- polling the table while it is empty.
+
+CREATE OR REPLACE FUNCTION notify_ocr_queue_new()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Payload is informational; the worker re-reads pending rows itself.
+    PERFORM pg_notify('ocr_queue_new', NEW.id);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ocr_queue_notify_new ON ocr_queue;
+CREATE TRIGGER ocr_queue_notify_new
+    AFTER INSERT ON ocr_queue
+    FOR EACH ROW
+    WHEN (NEW.status = 'pending')
+    EXECUTE FUNCTION notify_ocr_queue_new();
@@ -0,0 +1,21 @@
+-- Migration 005: OCR completion in one call
+-- OCRProcessor used to read raw_ingest.processing_status, write raw_ingest,
+-- then write ocr_queue: three round-trips and two transactions per asset.
+
+-- Merge `ps` into raw_ingest.processing_status, store the OCR payload and
+-- apply `patch` to the queue row, atomically. The jsonb merge happens
+-- server-side, so no read-back of processing_status is needed.
+CREATE OR REPLACE FUNCTION finalize_ocr(queue_id TEXT, context_id TEXT, patch JSONB, ps JSONB, ocr JSONB)
+RETURNS VOID
+LANGUAGE sql AS $$
+    UPDATE raw_ingest r
+    SET processing_status = COALESCE(r.processing_status, '{}'::jsonb) || ps,
+        ocr = finalize_ocr.ocr
+    WHERE r.id = finalize_ocr.context_id;
+
+    UPDATE ocr_queue q
+    SET status = COALESCE(patch->>'status', q.status),
+        completed_at = COALESCE((patch->>'completed_at')::TIMESTAMPTZ, q.completed_at),
+        result = COALESCE(patch->'result', q.result)
+    WHERE q.id = finalize_ocr.queue_id;
+$$;
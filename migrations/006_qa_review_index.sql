@@ -0,0 +1,9 @@
+-- Migration 006: Q&A review queue index
+-- The review page asks for the newest unverified pairs:
+--   SELECT * FROM qa_pairs WHERE verified = FALSE ORDER BY created_at DESC LIMIT 50;
+-- idx_qa_pairs_verified (migration 001) narrows to unverified rows but still
+-- sorts them; this partial index returns them already in order and shrinks
+-- as pairs are verified.
+CREATE INDEX IF NOT EXISTS idx_qa_pairs_review_queue
+    ON qa_pairs (created_at DESC)
+    WHERE verified = FALSE;
@@ -5,9 +5,10 @@ Coordinates crawler, asset segregation, and queue management
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
 
-from ingestion.crawler_agent import AdaptiveCrawlerAgent
 from ingestion.asset_segregator import AssetSegregator
 from ingestion.url_manager import URLManager
 
@@ -24,6 +25,17 @@ class IngestionOrchestrator:
     Orchestrates the complete ingestion pipeline
     """
     
+    # Concurrent asset downloads overall and per host
+    MAX_CONCURRENT_DOWNLOADS = 10
+    MAX_DOWNLOADS_PER_HOST = 3
+    
+    # Bound for the recently-queued URL set
+    SEEN_URLS_MAX = 50_000
+    
+    # crawl_seed_urls: discovered links buffered ahead of the queueing tasks
+    LINK_QUEUE_SIZE = 100
+    LINK_CONSUMERS = 4
+    
     def __init__(
         self,
         rate_limit_delay: float = 2.0,
@@ -36,17 +48,48 @@ class IngestionOrchestrator:
             rate_limit_delay: Delay between requests to same domain
             max_concurrent: Maximum concurrent crawls
         """
+        # Imported here so the module loads without Crawl4AI installed
+        from ingestion.crawler_agent import AdaptiveCrawlerAgent
+        
         self.crawler = AdaptiveCrawlerAgent(rate_limit_delay=rate_limit_delay)
         self.segregator = AssetSegregator()
         self.url_manager = URLManager()
         self.max_concurrent = max_concurrent
         
+        # Asset download limits, shared by every page in flight
+        self._download_slots = asyncio.Semaphore(self.MAX_CONCURRENT_DOWNLOADS)
+        self._host_download_slots: Dict[str, asyncio.Semaphore] = {}
+        
+        # Created by process_ocr_queue on first use
+        self._ocr_processor = None
+        
+        # Seeds on the same site link to the same pages; queue each URL
+        # once per process.
+        self._seen_urls: "OrderedDict[str, None]" = OrderedDict()
+        
         logger.info("IngestionOrchestrator initialized")
     
+    async def __aenter__(self) -> "IngestionOrchestrator":
+        """Share one browser and one HTTP connection pool across the run."""
+        await self.crawler.__aenter__()
+        try:
+            await self.segregator.__aenter__()
+        except BaseException:
+            await self.crawler.__aexit__(None, None, None)
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.segregator.__aexit__(*exc_info)
+        finally:
+            await self.crawler.__aexit__(*exc_info)
+    
     async def process_queue(
         self,
         batch_size: int = 10,
-        domain_filter: Optional[str] = None
+        domain_filter: Optional[str] = None,
+        details_sink: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         Process URLs from the crawl queue
@@ -54,12 +97,14 @@ class IngestionOrchestrator:
         Args:
             batch_size: Number of URLs to process
             domain_filter: Filter by specific domain
+            details_sink: Receives each per-URL detail instead of
+                results['details'] (which then stays empty)
             
         Returns:
             Processing results summary
         """
-        # Get next URLs from queue
-        queue_entries = self.url_manager.get_next_urls(
+        # Claim next URLs from queue (already marked as processing)
+        queue_entries = self.url_manager.claim_next_urls(
             limit=batch_size,
             domain_filter=domain_filter
         )
@@ -70,99 +115,149 @@ class IngestionOrchestrator:
         
         logger.info(f"Processing {len(queue_entries)} URLs from queue")
         
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        async def bounded_process(entry: Dict[str, Any]):
+            # Held across crawl + segregation so at most max_concurrent
+            # pages are in flight.
+            async with semaphore:
+                return await self._process_entry(entry)
+        
+        outcomes = await asyncio.gather(
+            *(bounded_process(entry) for entry in queue_entries),
+            return_exceptions=True
+        )
+        
         results = {
             'processed': 0,
             'successful': 0,
             'failed': 0,
             'details': []
         }
+        crawled = []
         
-        for entry in queue_entries:
-            doc_id = entry['doc_id']
-            url = entry['url']
-            
-            # Mark as processing
-            self.url_manager.mark_processing(doc_id)
-            
-            try:
-                # Crawl the URL
-                result = await self.crawler.crawl(
-                    url=url,
-                    source_config=entry.get('metadata', {}),
-                    extraction_strategy='css'
-                )
-                
+        for entry, outcome in zip(queue_entries, outcomes):
+            if isinstance(outcome, BaseException):
+                # _process_entry handles its own errors; this is a last resort
+                logger.error(f"Error processing {entry['url']}: {outcome}")
+                outcome = (False, {'url': entry['url'], 'status': 'error', 'error': str(outcome)}, None)
+            processed, detail, result = outcome
+            if processed:
                 results['processed'] += 1
-                
-                if result.get('success', False):
-                    context_id = result.get('context_id')
-                    
-                    if not context_id:
-                        logger.error(f"No context_id in result: {result}")
-                        # Mark as failed
-                        error = "No context_id returned from crawler"
-                        self.url_manager.mark_failed(doc_id, error, retry=True)
-                        results['failed'] += 1
-                        results['details'].append({
-                            'url': url,
-                            'status': 'failed',
-                            'error': error
-                        })
-                        continue
-                    
-                    # Segregate assets
-                    result = self.segregator.segregate_from_context(result)
-
-                    # Update raw_ingest with segregation data (best-effort)
-                    try:
-                        self.segregator.repo.update_raw_ingest_assets(
-                            context_id,
-                            assets=result.get('assets', {}) or {},
-                            asset_counts=result.get('asset_counts', {}) or {},
-                        )
-                    except Exception as e:
-                        logger.warning(f"Could not update assets in Supabase: {e}")
-                    
-                    # Mark queue entry as completed
-                    self.url_manager.mark_completed(doc_id, context_id)
-                    
-                    results['successful'] += 1
-                    results['details'].append({
-                        'url': url,
-                        'status': 'success',
-                        'context_id': context_id,
-                        'assets': result.get('asset_counts', {})
-                    })
-                    
-                    # Download and queue PDFs for OCR
-                    await self._process_assets(result, context_id)
-                    
-                else:
-                    # Mark as failed
-                    error = result.get('error', 'Unknown error')
-                    self.url_manager.mark_failed(doc_id, error, retry=True)
-                    results['failed'] += 1
-                    results['details'].append({
-                        'url': url,
-                        'status': 'failed',
-                        'error': error
-                    })
-            
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}")
-                self.url_manager.mark_failed(doc_id, str(e), retry=True)
+            if detail['status'] == 'success':
+                results['successful'] += 1
+                crawled.append((entry['doc_id'], detail['context_id'], result))
+            else:
                 results['failed'] += 1
-                results['details'].append({
-                    'url': url,
-                    'status': 'error',
-                    'error': str(e)
-                })
+            if details_sink is not None:
+                details_sink(detail)
+            else:
+                results['details'].append(detail)
+        
+        if crawled:
+            # Update raw_ingest with segregation data in one request (best-effort)
+            try:
+                await asyncio.to_thread(self.segregator.repo.update_raw_ingest_assets_many, [
+                    {
+                        'id': context_id,
+                        'assets': result.get('assets', {}) or {},
+                        'asset_counts': result.get('asset_counts', {}) or {},
+                    }
+                    for _, context_id, result in crawled
+                ])
+            except Exception as e:
+                logger.warning(f"Could not update assets in Supabase: {e}")
+            
+            # Mark queue entries as completed, in one round-trip
+            marked = await asyncio.to_thread(self.url_manager.mark_many, [
+                {'doc_id': doc_id, 'status': 'completed', 'context_id': context_id}
+                for doc_id, context_id, _ in crawled
+            ])
+            if marked < len(crawled):
+                # Completion is idempotent; redo it row by row rather than
+                # leaving crawled entries to be reclaimed and crawled again
+                for doc_id, context_id, _ in crawled:
+                    await asyncio.to_thread(self.url_manager.mark_completed, doc_id, context_id)
+            
+            # Download and queue PDFs for OCR. Runs after the bulk write
+            # above, since downloads merge into the same assets column;
+            # _process_assets applies its own download limits.
+            asset_outcomes = await asyncio.gather(
+                *(self._process_assets(result, context_id) for _, context_id, result in crawled),
+                return_exceptions=True
+            )
+            for (_, context_id, _), outcome in zip(crawled, asset_outcomes):
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Failed to process assets for {context_id}: {outcome}")
         
         logger.info(
             f"Batch complete: {results['successful']}/{results['processed']} successful"
         )
         return results
     
+    async def _process_entry(
+        self,
+        entry: Dict[str, Any]
+    ) -> Tuple[bool, Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Crawl and segregate one queue entry
+        
+        Failures are marked on the queue here; successful entries are
+        completed by process_queue after their assets are stored.
+        
+        Args:
+            entry: Claimed queue entry
+            
+        Returns:
+            (whether the crawl returned, result detail for the batch summary,
+            segregated context object on success)
+        """
+        doc_id = entry['doc_id']
+        url = entry['url']
+        processed = False
+        
+        try:
+            # Crawl the URL
+            result = await self.crawler.crawl(
+                url=url,
+                source_config=entry.get('metadata', {}),
+                extraction_strategy='css'
+            )
+            
+            processed = True
+            
+            if not result.get('success', False):
+                # Mark as failed
+                error = result.get('error', 'Unknown error')
+                await asyncio.to_thread(self.url_manager.mark_failed, doc_id, error, retry=True)
+                return processed, {'url': url, 'status': 'failed', 'error': error}, None
+            
+            context_id = result.get('context_id')
+            
+            if not context_id:
+                logger.error(f"No context_id in result: {result}")
+                # Mark as failed
+                error = "No context_id returned from crawler"
+                await asyncio.to_thread(self.url_manager.mark_failed, doc_id, error, retry=True)
+                return processed, {'url': url, 'status': 'failed', 'error': error}, None
+            
+            # Segregate assets; off the event loop, like the queue writes,
+            # so other pages keep crawling meanwhile
+            result = await asyncio.to_thread(self.segregator.segregate_from_context, result)
+            
+            detail = {
+                'url': url,
+                'status': 'success',
+                'context_id': context_id,
+                'assets': result.get('asset_counts', {})
+            }
+            return processed, detail, result
+        
+        except Exception as e:
+            logger.error(f"Error processing {url}: {str(e)}")
+            await asyncio.to_thread(self.url_manager.mark_failed, doc_id, str(e), retry=True)
+            return processed, {'url': url, 'status': 'error', 'error': str(e)}, None
+    
     async def _process_assets(
         self,
         context_obj: Dict[str, Any],
@@ -177,26 +272,47 @@ class IngestionOrchestrator:
         """
         assets = context_obj.get('assets', {})
         
-        # Process PDFs
-        for pdf in assets.get('pdf_links', [])[:5]:  # Limit to 5 PDFs per page
-            if pdf.get('needs_download', False):
-                try:
-                    storage_path = await self.segregator.download_and_store_asset(
+        async def download_one(pdf: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            host = urlparse(pdf['url']).netloc
+            host_slots = self._host_download_slots.setdefault(
+                host, asyncio.Semaphore(self.MAX_DOWNLOADS_PER_HOST)
+            )
+            record = None
+            try:
+                async with self._download_slots, host_slots:
+                    record = await self.segregator.fetch_and_store_asset(
                         url=pdf['url'],
                         asset_type='pdf',
                         context_id=context_id
                     )
-                    
-                    if storage_path and pdf.get('needs_ocr', False):
-                        # Create OCR queue entry
-                        self.segregator.create_ocr_queue_entry(
-                            storage_path=storage_path,
-                            context_id=context_id,
-                            asset_type='pdf',
-                            priority=pdf.get('priority', 'medium')
-                        )
-                except Exception as e:
-                    logger.error(f"Failed to process PDF {pdf['url']}: {str(e)}")
+                
+                if record and pdf.get('needs_ocr', False):
+                    # Create OCR queue entry
+                    await asyncio.to_thread(
+                        self.segregator.create_ocr_queue_entry,
+                        storage_path=record['storage_path'],
+                        context_id=context_id,
+                        asset_type='pdf',
+                        priority=pdf.get('priority', 'medium')
+                    )
+            except Exception as e:
+                logger.error(f"Failed to process PDF {pdf['url']}: {str(e)}")
+            return record
+        
+        # Process PDFs concurrently; filter before limiting so already
+        # downloaded links don't use up the page's slots
+        pdfs = [
+            pdf for pdf in assets.get('pdf_links', [])
+            if pdf.get('needs_download', False)
+        ][:5]  # Limit to 5 PDFs per page
+        if not pdfs:
+            return
+        records = await asyncio.gather(*(download_one(pdf) for pdf in pdfs))
+        
+        # Record the page's downloads in one raw_ingest read and write
+        await asyncio.to_thread(
+            self.segregator.record_downloads, context_id, [r for r in records if r]
+        )
 
     def process_ocr_queue(self, limit: int = 5) -> Dict[str, int]:
         """Process pending OCR tasks.
@@ -204,11 +320,22 @@ class IngestionOrchestrator:
         This runs a local OCR worker step that consumes `ocr_queue` items and writes
         extracted text back to `raw_ingest`.
         """
-        from ingestion.supabase_repo import SupabaseRepo
-        from ingestion.ocr_processor import OCRProcessor
+        if self._ocr_processor is None:
+            from ingestion.ocr_processor import OCRProcessor
 
-        processor = OCRProcessor(repo=SupabaseRepo.from_env())
-        return processor.process_pending(limit=limit)
+            # Built once, on first use, around the repo the segregator already holds
+            self._ocr_processor = OCRProcessor(repo=self.segregator.repo)
+        return self._ocr_processor.process_pending(limit=limit)
+    
+    def _mark_seen(self, url: str) -> bool:
+        """Record `url` as queued by this process; False if it already was (LRU-bounded)."""
+        if url in self._seen_urls:
+            self._seen_urls.move_to_end(url)
+            return False
+        self._seen_urls[url] = None
+        if len(self._seen_urls) > self.SEEN_URLS_MAX:
+            self._seen_urls.popitem(last=False)
+        return True
     
     async def crawl_seed_urls(
         self,
@@ -226,40 +353,55 @@ class IngestionOrchestrator:
             List of discovered URLs
         """
         discovered_urls = []
+        # Bounded, so crawling pauses when scoring/queueing falls behind
+        links: "asyncio.Queue[Optional[Tuple[str, float]]]" = asyncio.Queue(maxsize=self.LINK_QUEUE_SIZE)
         
-        for url in seed_urls:
+        async def produce():
             try:
-                # Crawl seed URL
-                result = await self.crawler.crawl(
-                    url=url,
-                    source_config=source_config,
-                    extraction_strategy='css'
-                )
-                
-                if result.get('success', False):
-                    # Extract and score links
-                    content = result.get('content', {})
-                    links = content.get('links', {})
+                for url in seed_urls:
+                    try:
+                        # Crawl seed URL
+                        result = await self.crawler.crawl(
+                            url=url,
+                            source_config=source_config,
+                            extraction_strategy='css'
+                        )
+                        
+                        if result.get('success', False):
+                            # Score the seed's links in one batch (could pass anchor
+                            # texts) and hand relevant ones to the consumers
+                            content = result.get('content', {})
+                            internal = content.get('links', {}).get('internal', [])
+                            for link, score in zip(internal, self.crawler.score_links_batch(internal)):
+                                if score > 0.5:  # Only queue relevant links
+                                    await links.put((link, score))
                     
-                    for link in links.get('internal', []):
-                        # Score link relevance
-                        score = self.crawler.score_link_relevance(
+                    except Exception as e:
+                        logger.error(f"Error crawling seed URL {url}: {str(e)}")
+            finally:
+                for _ in range(self.LINK_CONSUMERS):
+                    await links.put(None)
+        
+        async def consume():
+            while (item := await links.get()) is not None:
+                link, score = item
+                try:
+                    if self._mark_seen(link):  # Only queue new links
+                        # Add to queue; None means it was already pending
+                        queue_id = await asyncio.to_thread(
+                            self.url_manager.add_url,
                             url=link,
-                            text=''  # Could extract anchor text
+                            source_config=source_config,
+                            priority='high' if score > 0.8 else 'medium'
                         )
-                        
-                        if score > 0.5:  # Only queue relevant links
+                        if queue_id:
                             discovered_urls.append(link)
-                            
-                            # Add to queue
-                            self.url_manager.add_url(
-                                url=link,
-                                source_config=source_config,
-                                priority='high' if score > 0.8 else 'medium'
-                            )
-                
-            except Exception as e:
-                logger.error(f"Error crawling seed URL {url}: {str(e)}")
+                except Exception as e:
+                    # Not queued after all; let a later seed offer it again
+                    self._seen_urls.pop(link, None)
+                    logger.error(f"Error queueing discovered URL {link}: {str(e)}")
+        
+        await asyncio.gather(produce(), *(consume() for _ in range(self.LINK_CONSUMERS)))
         
         logger.info(f"Discovered {len(discovered_urls)} URLs from seed crawl")
         return discovered_urls
@@ -289,37 +431,36 @@ async def main():
     Example ingestion pipeline execution
     """
     # Initialize orchestrator
-    orchestrator = IngestionOrchestrator(
+    async with IngestionOrchestrator(
         rate_limit_delay=3.0,
         max_concurrent=3
-    )
-    
-    # Example 1: Crawl seed URLs (initial discovery)
-    logger.info("=== STEP 1: Seed URL Crawling ===")
-    seed_urls = [
-        'http://www.epid.gov.lk/',
-        'http://www.health.gov.lk/',
-    ]
-    
-    source_config = {
-        'agency': 'Epidemiology Unit',
-        'reliability': 0.95,
-        'user_demand': 0.9
-    }
-    
-    discovered = await orchestrator.crawl_seed_urls(seed_urls, source_config)
-    print(f"✓ Discovered {len(discovered)} URLs")
-    
-    # Example 2: Process queue
-    logger.info("\n=== STEP 2: Processing Queue ===")
-    results = await orchestrator.process_queue(batch_size=5)
-    print(f"✓ Processed: {results['successful']}/{results['processed']} successful")
-    
-    # Example 3: Get system status
-    logger.info("\n=== STEP 3: System Status ===")
-    status = orchestrator.get_system_status()
-    print(f"Queue Status: {status['queue']}")
-    print(f"Asset Stats: {status['assets']}")
+    ) as orchestrator:
+        # Example 1: Crawl seed URLs (initial discovery)
+        logger.info("=== STEP 1: Seed URL Crawling ===")
+        seed_urls = [
+            'http://www.epid.gov.lk/',
+            'http://www.health.gov.lk/',
+        ]
+        
+        source_config = {
+            'agency': 'Epidemiology Unit',
+            'reliability': 0.95,
+            'user_demand': 0.9
+        }
+        
+        discovered = await orchestrator.crawl_seed_urls(seed_urls, source_config)
+        print(f"✓ Discovered {len(discovered)} URLs")
+        
+        # Example 2: Process queue
+        logger.info("\n=== STEP 2: Processing Queue ===")
+        results = await orchestrator.process_queue(batch_size=5)
+        print(f"✓ Processed: {results['successful']}/{results['processed']} successful")
+        
+        # Example 3: Get system status
+        logger.info("\n=== STEP 3: System Status ===")
+        status = orchestrator.get_system_status()
+        print(f"Queue Status: {status['queue']}")
+        print(f"Asset Stats: {status['assets']}")
     
     # Example 4: Manual URL addition
     logger.info("\n=== STEP 4: Manual URL Addition ===")
@@ -3,6 +3,10 @@
 Pulls pending items from Supabase `ocr_queue`, downloads assets from Supabase Storage,
 and writes extracted text back to `raw_ingest`.
 
+When SUPABASE_DB_URL is set and asyncpg is installed, the worker sleeps on
+Postgres `LISTEN ocr_queue_new` (migrations/004_ocr_queue_notify.sql) and wakes
+as soon as work is queued; otherwise it polls.
+
 Usage (PowerShell):
     $env:SUPABASE_URL='https://YOUR_PROJECT.supabase.co'
     $env:SUPABASE_SERVICE_ROLE_KEY='YOUR_SERVICE_ROLE_KEY'
@@ -10,8 +14,10 @@ Usage (PowerShell):
     python run_ocr.py
 """
 
-import time
+import asyncio
 import logging
+import os
+from typing import Any, Optional
 
 from ingestion.supabase_repo import SupabaseRepo
 from ingestion.ocr_processor import OCRProcessor
@@ -19,21 +25,59 @@ from ingestion.ocr_processor import OCRProcessor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+NOTIFY_CHANNEL = "ocr_queue_new"
+
+# Idle wait between checks: a heartbeat when notifications are available,
+# the poll interval when they are not.
+LISTEN_HEARTBEAT_SECONDS = 30
+POLL_INTERVAL_SECONDS = 10
+
+
+async def _listen(wakeup: asyncio.Event) -> Optional[Any]:
+    """Subscribe to ocr_queue inserts; returns the connection, or None to poll."""
+    dsn = os.getenv("SUPABASE_DB_URL")
+    if not dsn:
+        return None
+    try:
+        import asyncpg
+    except ImportError:
+        logger.warning("SUPABASE_DB_URL is set but asyncpg is not installed; polling instead")
+        return None
+
+    try:
+        conn = await asyncpg.connect(dsn)
+        await conn.add_listener(NOTIFY_CHANNEL, lambda *_: wakeup.set())
+    except Exception as e:
+        logger.warning("Could not LISTEN on %s, polling instead: %s", NOTIFY_CHANNEL, e)
+        return None
+    return conn
+
 
-def main():
+async def main():
     processor = OCRProcessor(repo=SupabaseRepo.from_env())
+    wakeup = asyncio.Event()
+    conn = await _listen(wakeup)
+    idle_timeout = LISTEN_HEARTBEAT_SECONDS if conn else POLL_INTERVAL_SECONDS
 
-    logger.info("Starting OCR worker")
-    while True:
-        stats = processor.process_pending(limit=5)
-        logger.info("OCR batch: %s", stats)
+    logger.info("Starting OCR worker (%s)", "listening" if conn else "polling")
+    try:
+        while True:
+            # Cleared before the batch so inserts made while it runs still wake us.
+            wakeup.clear()
+            # Downloads run ahead of OCR so the two overlap
+            stats = await processor.process_pending_pipelined(limit=5)
+            logger.info("OCR batch: %s", stats)
 
-        # Sleep when idle
-        if stats.get("processed", 0) == 0:
-            time.sleep(10)
-        else:
-            time.sleep(1)
+            # Keep draining while there is work; otherwise wait for a notification
+            if stats.get("processed", 0) == 0:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=idle_timeout)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        if conn is not None:
+            await conn.close()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -3,15 +3,16 @@ Scheduled Crawling Automation
 
 Automates the crawling and annotation pipeline:
 - Runs ingestion every 12 hours
-- Runs bias audit weekly
+- Runs bias audit weekly, at 02:00 UTC on the audit day
 - Monitors queue health
 """
 
 import asyncio
 import logging
 import sys
-from datetime import datetime, timezone
-from typing import Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +27,31 @@ logging.basicConfig(
 )
 
 
+def _next_weekday(now: datetime, weekday: int, hour: int = 0) -> datetime:
+    """`hour`:00 (in now's timezone) of the first day on or after `now` that falls on `weekday`."""
+    day_start = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    return day_start + timedelta(days=(weekday - now.weekday()) % 7)
+
+
 class IngestionScheduler:
     """
     Schedules and runs ingestion tasks.
     """
     
+    # Trigger names accepted by trigger()
+    TASKS = ('crawl', 'bias_audit')
+    
+    # Wait before retrying a task whose last run failed; doubles with each
+    # consecutive failure of that task, up to MAX_RETRY_DELAY_SECONDS
+    RETRY_DELAY_SECONDS = 300
+    MAX_RETRY_DELAY_SECONDS = 3600
+    
+    # Documents annotated at once after a crawl
+    ANNOTATION_CONCURRENCY = 8
+    
+    # Hour (UTC) on bias_audit_day when the audit fires
+    BIAS_AUDIT_HOUR = 2
+    
     def __init__(
         self,
         crawl_interval_hours: float = 12.0,
@@ -50,8 +71,27 @@ class IngestionScheduler:
         self.batch_size = batch_size
         
         self._running = False
-        self._last_crawl: Optional[datetime] = None
+        self._last_crawl: Optional[datetime] = None  # wall clock, for logs/status
+        self._last_crawl_mono: Optional[float] = None  # time.monotonic(), for interval checks
         self._last_bias_audit: Optional[datetime] = None
+        # This week's slot; already past (so due at once) when started later on the audit day
+        self._next_bias_audit_at = _next_weekday(
+            datetime.now(timezone.utc), bias_audit_day, hour=self.BIAS_AUDIT_HOUR
+        )
+        
+        # Per task: failed runs since its last success, and the
+        # time.monotonic() before which it isn't retried
+        self._consecutive_failures: Dict[str, int] = {task: 0 for task in self.TASKS}
+        self._retry_at: Dict[str, float] = {}
+        
+        # Manual kickoffs ('crawl' / 'bias_audit'); also wakes the loop on stop()
+        self._trigger_queue: asyncio.Queue[str] = asyncio.Queue()
+        # Loop running start(), so other threads can post to the queue
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Built on the first crawl cycle and reused, so its OCR processor
+        # and URL manager caches carry over between cycles
+        self._orchestrator = None
     
     async def run_crawl_cycle(self):
         """Run a single crawl and annotation cycle."""
@@ -63,52 +103,80 @@ class IngestionScheduler:
             from ingestion.supabase_repo import SupabaseRepo
             
             # Initialize components
-            orchestrator = IngestionOrchestrator(
-                rate_limit_delay=3.0,
-                max_concurrent=3
-            )
+            if self._orchestrator is None:
+                self._orchestrator = IngestionOrchestrator(
+                    rate_limit_delay=3.0,
+                    max_concurrent=3
+                )
+            orchestrator = self._orchestrator
             
             annotator = AnnotationProcessor()
             repo = SupabaseRepo.from_env()
             
-            # Process queue
-            results = await orchestrator.process_queue(batch_size=self.batch_size)
+            # Process queue, keeping only what annotation needs from each detail
+            context_ids: List[str] = []
+            
+            def collect_context_id(detail: Dict[str, Any]):
+                if detail.get('status') == 'success' and detail.get('context_id'):
+                    context_ids.append(detail['context_id'])
+            
+            # One browser and download pool for the whole batch
+            async with orchestrator:
+                results = await orchestrator.process_queue(
+                    batch_size=self.batch_size,
+                    details_sink=collect_context_id
+                )
             
             logger.info(f"Crawl results: {results['successful']}/{results['processed']} successful")
             
-            # Annotate new content
-            for detail in results.get('details', []):
-                if detail.get('status') == 'success':
-                    context_id = detail.get('context_id')
-                    if context_id:
-                        try:
-                            # Fetch content
-                            doc = repo.get_raw_ingest(context_id)
-                            if doc and doc.get('content'):
-                                content = doc['content']
-                                text = content.get('markdown', '') or content.get('cleaned_html', '')
+            # Annotate new content, overlapping the per-document round-trips
+            try:
+                # Fetch all new content in one request
+                docs = await asyncio.to_thread(repo.get_raw_ingest_many, context_ids)
+            except Exception as e:
+                logger.error(f"Could not fetch content for annotation: {e}")
+                docs = {}
+            
+            semaphore = asyncio.Semaphore(self.ANNOTATION_CONCURRENCY)
+            
+            async def annotate_one(context_id: str, doc: Dict[str, Any]):
+                async with semaphore:
+                    try:
+                        if doc.get('content'):
+                            content = doc['content']
+                            text = content.get('markdown', '') or content.get('cleaned_html', '')
+                            
+                            if text:
+                                # Run annotation
+                                result = await asyncio.to_thread(
+                                    annotator.process,
+                                    text=text,
+                                    context_id=context_id,
+                                    source_url=doc.get('url')
+                                )
+                                
+                                # Save annotations
+                                await asyncio.to_thread(annotator.save_to_supabase, result, repo)
                                 
-                                if text:
-                                    # Run annotation
-                                    result = annotator.process(
-                                        text=text,
-                                        context_id=context_id,
-                                        source_url=doc.get('url')
-                                    )
-                                    
-                                    # Save annotations
-                                    annotator.save_to_supabase(result, repo)
-                                    
-                        except Exception as e:
-                            logger.error(f"Annotation error for {context_id}: {e}")
+                    except Exception as e:
+                        logger.error(f"Annotation error for {context_id}: {e}")
+            
+            await asyncio.gather(*(
+                annotate_one(context_id, docs[context_id])
+                for context_id in context_ids
+                if context_id in docs
+            ))
             
             # Process OCR queue
             ocr_results = orchestrator.process_ocr_queue(limit=5)
             logger.info(f"OCR results: {ocr_results}")
             
             self._last_crawl = datetime.now(timezone.utc)
+            self._last_crawl_mono = time.monotonic()
+            self._record_success('crawl')
             
         except Exception as e:
+            self._record_failure('crawl')
             logger.error(f"Crawl cycle error: {e}")
     
     async def run_bias_audit(self):
@@ -138,33 +206,76 @@ class IngestionScheduler:
                     logger.warning(f"BIAS ALERT: {alert.message}")
             
             self._last_bias_audit = datetime.now(timezone.utc)
+            self._next_bias_audit_at = _next_weekday(
+                self._last_bias_audit + timedelta(days=1),
+                self.bias_audit_day,
+                hour=self.BIAS_AUDIT_HOUR
+            )
+            self._record_success('bias_audit')
             
         except Exception as e:
+            self._record_failure('bias_audit')
             logger.error(f"Bias audit error: {e}")
     
+    def _record_success(self, task: str):
+        self._consecutive_failures[task] = 0
+        self._retry_at.pop(task, None)
+    
+    def _record_failure(self, task: str):
+        """Back `task` off exponentially rather than hammering a service that is down."""
+        self._consecutive_failures[task] += 1
+        delay = min(
+            self.RETRY_DELAY_SECONDS * 2 ** (self._consecutive_failures[task] - 1),
+            self.MAX_RETRY_DELAY_SECONDS
+        )
+        self._retry_at[task] = time.monotonic() + delay
+    
+    def _seconds_until(self, task: str, due_in: float) -> float:
+        """Seconds until `task`, due in `due_in` seconds, may run, counting its backoff."""
+        if due_in > 0:
+            return due_in
+        return max(self._retry_at.get(task, 0.0) - time.monotonic(), 0.0)
+    
     def should_run_crawl(self) -> bool:
         """Check if crawl should run."""
-        if self._last_crawl is None:
-            return True
-        
-        elapsed = datetime.now(timezone.utc) - self._last_crawl
-        return elapsed.total_seconds() >= (self.crawl_interval_hours * 3600)
+        return self._seconds_until('crawl', self._seconds_until_crawl()) <= 0
+    
+    def _seconds_until_crawl(self) -> float:
+        # Intervals use the monotonic clock; wall-clock jumps can't skip or repeat a crawl
+        if self._last_crawl_mono is None:
+            return 0.0
+        elapsed = time.monotonic() - self._last_crawl_mono
+        return self.crawl_interval_hours * 3600 - elapsed
     
     def should_run_bias_audit(self) -> bool:
         """Check if bias audit should run."""
-        now = datetime.now(timezone.utc)
-        
-        # Run on specified day
-        if now.weekday() != self.bias_audit_day:
-            return False
-        
-        # Only run once per day
-        if self._last_bias_audit:
-            elapsed = now - self._last_bias_audit
-            if elapsed.total_seconds() < 86400:  # 24 hours
-                return False
-        
-        return True
+        # Rescheduled only after a successful audit, so a failed one is retried
+        return self._seconds_until('bias_audit', self._seconds_until_bias_audit()) <= 0
+    
+    def _seconds_until_bias_audit(self) -> float:
+        return (self._next_bias_audit_at - datetime.now(timezone.utc)).total_seconds()
+    
+    def _seconds_until_next_run(self) -> float:
+        """Seconds until the next scheduled crawl or bias audit may run."""
+        return min(
+            self._seconds_until('crawl', self._seconds_until_crawl()),
+            self._seconds_until('bias_audit', self._seconds_until_bias_audit())
+        )
+    
+    def _post(self, item: str):
+        """Put `item` on the trigger queue; safe from any thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            # asyncio.Queue isn't thread-safe; let the loop do the put
+            loop.call_soon_threadsafe(self._trigger_queue.put_nowait, item)
+        else:
+            self._trigger_queue.put_nowait(item)
+    
+    def trigger(self, task: str):
+        """Run `task` ('crawl' or 'bias_audit') as soon as the scheduler is idle."""
+        if task not in self.TASKS:
+            raise ValueError(f"Unknown task: {task}")
+        self._post(task)
     
     async def start(self):
         """Start the scheduler loop."""
@@ -173,6 +284,7 @@ class IngestionScheduler:
         logger.info(f"  Bias audit day: {self.bias_audit_day}")
         
         self._running = True
+        self._loop = asyncio.get_running_loop()
         
         while self._running:
             try:
@@ -184,8 +296,19 @@ class IngestionScheduler:
                 if self.should_run_bias_audit():
                     await self.run_bias_audit()
                 
-                # Sleep for 5 minutes between checks
-                await asyncio.sleep(300)
+                # Sleep until the next task is due or a trigger arrives
+                try:
+                    task = await asyncio.wait_for(
+                        self._trigger_queue.get(),
+                        timeout=self._seconds_until_next_run()
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                
+                if task == 'crawl':
+                    await self.run_crawl_cycle()
+                elif task == 'bias_audit':
+                    await self.run_bias_audit()
                 
             except KeyboardInterrupt:
                 logger.info("Scheduler interrupted by user")
@@ -197,6 +320,8 @@ class IngestionScheduler:
     def stop(self):
         """Stop the scheduler."""
         self._running = False
+        # Wake the loop so it notices without waiting for the next task
+        self._post('stop')
         logger.info("Scheduler stopped")
 
 
@@ -10,6 +10,7 @@ Server-side scripts should use the *service role* key.
 from __future__ import annotations
 
 import os
+import threading
 from typing import Optional
 
 
@@ -24,6 +25,9 @@ except Exception:
 
 
 _SUPABASE_CLIENT = None
+# Guards client creation so concurrent first callers share one client
+# (and one HTTP connection pool).
+_SUPABASE_CLIENT_LOCK = threading.Lock()
 
 
 def _require_env(name: str) -> str:
@@ -47,7 +51,7 @@ def get_storage_bucket() -> str:
 
 
 def get_supabase():
-    """Return a singleton supabase client."""
+    """Return a singleton supabase client (safe to call from several threads)."""
     global _SUPABASE_CLIENT
     if _SUPABASE_CLIENT is not None:
         return _SUPABASE_CLIENT
@@ -59,5 +63,7 @@ def get_supabase():
             "Supabase client not installed. Install: pip install supabase"
         ) from e
 
-    _SUPABASE_CLIENT = create_client(get_supabase_url(), get_supabase_key())
+    with _SUPABASE_CLIENT_LOCK:
+        if _SUPABASE_CLIENT is None:
+            _SUPABASE_CLIENT = create_client(get_supabase_url(), get_supabase_key())
     return _SUPABASE_CLIENT
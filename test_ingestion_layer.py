@@ -17,7 +17,7 @@ Optional crawler smoke:
 from __future__ import annotations
 
 import os
-import time
+import uuid
 from pathlib import Path
 
 import pytest
@@ -34,30 +34,12 @@ if not _env_is_truthy("RUN_INGESTION_INTEGRATION_TESTS"):
     )
 
 
-@pytest.fixture(scope="session")
-def supabase_ready():
-    """Initialize Supabase repo using env vars.
-
-    Requires:
-      - SUPABASE_URL
-      - SUPABASE_SERVICE_ROLE_KEY (recommended)
-    """
-    if not os.getenv("SUPABASE_URL"):
-        pytest.skip("SUPABASE_URL not set")
-    if not (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")):
-        pytest.skip("SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY not set")
-
-    from ingestion.supabase_repo import SupabaseRepo
-
-    return SupabaseRepo.from_env()
-
-
 def test_url_manager_adds_and_reads_queue(supabase_ready):
     from ingestion.url_manager import URLManager
 
     mgr = URLManager(repo=supabase_ready)
 
-    url = f"https://example.com/health-bulletin?t={int(time.time())}"
+    url = f"https://example.com/health-bulletin?t={uuid.uuid4().hex[:8]}"
     doc_id = mgr.add_url(
         url=url,
         priority="high",
@@ -65,7 +47,7 @@ def test_url_manager_adds_and_reads_queue(supabase_ready):
     )
     assert doc_id is not None
 
-    next_urls = mgr.get_next_urls(limit=10)
+    next_urls = mgr.get_next_urls(limit=10, columns="url")
     assert any(entry.get("url") == url for entry in next_urls)
 
     # Cleanup
@@ -75,7 +57,7 @@ def test_url_manager_adds_and_reads_queue(supabase_ready):
 def test_asset_segregator_can_enqueue_ocr(supabase_ready):
     from ingestion.asset_segregator import AssetSegregator
 
-    context_id = f"ctx_{int(time.time())}"
+    context_id = f"ctx_{uuid.uuid4().hex[:8]}"
 
     # Seed raw_ingest row
     supabase_ready.supabase.table("raw_ingest").upsert(
@@ -95,6 +95,13 @@ class TestLanguageDetector:
         assert "latin" in distribution
         assert distribution["latin"] > 0.9
     
+    def test_numpy_script_counts_match_python(self, detector):
+        """Test the NumPy script counter agrees with the pure-Python one."""
+        pytest.importorskip("numpy")
+        text = "ඩෙංගු clinic டெங்கு, Café ÀÿŁ ɏ 123 ১২৩ ½ 😀 (ok)!\n\t\u00a0「health」"
+        
+        assert detector._count_scripts_np(text) == detector._count_scripts(text)
+    
     # -------------------------
     # Helper Methods Tests
     # -------------------------
@@ -150,6 +157,32 @@ class TestLanguageDetector:
         assert results[1].language == Language.TAMIL
         assert results[2].language == Language.ENGLISH
     
+    def test_detect_batch_in_worker_processes(self, detector):
+        """Test large batches can be spread over worker processes."""
+        texts = [f"Dengue clinic {i}" for i in range(40)] + ["ඩෙංගු වෛද්‍ය"] * 2
+        results = detector.detect_batch(texts, max_workers=2)
+        
+        assert len(results) == 42
+        assert all(r.language == Language.ENGLISH for r in results[:40])
+        assert results[40].language == Language.SINHALA
+    
+    def test_long_text_judged_on_head_and_tail(self):
+        """Test long texts are classified from a head+tail sample."""
+        text = "ඩෙංගු " * 100 + "clinic " * 1000 + "ඩෙංගු " * 100
+        
+        sampled = LanguageDetector(use_langdetect_fallback=False)
+        full = LanguageDetector(use_langdetect_fallback=False, max_scan_chars=None)
+        
+        assert sampled.detect(text).language == Language.SINHALA
+        assert full.detect(text).language == Language.ENGLISH
+    
+    def test_detect_caches_short_texts(self, detector):
+        """Test repeated short texts are served from the cache."""
+        first = detector.detect("Dengue clinic")
+        
+        assert detector.detect("Dengue clinic") is first
+        assert detector.detect("x" * 600) is not detector.detect("x" * 600)
+    
     # -------------------------
     # Convenience Function Test
     # -------------------------
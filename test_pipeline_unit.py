@@ -10,7 +10,7 @@ They use small fakes/mocks to validate behavior and integration points.
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import pytest
 
@@ -20,12 +20,35 @@ import pytest
 # -------------------------
 
 
+class UniqueViolation(Exception):
+    """PostgREST-style error for SQLSTATE 23505."""
+
+    code = "23505"
+
+
+class MissingFunction(Exception):
+    """PostgREST-style error for an RPC whose function isn't installed."""
+
+    code = "PGRST202"
+
+
 class FakeRepo:
-    def __init__(self, blobs: Dict[str, bytes]):
-        self._blobs = dict(blobs)
+    def __init__(self, blobs: Optional[Dict[str, bytes]] = None):
+        self._blobs = dict(blobs or {})
         self.ocr_queue_updates: Dict[str, Dict[str, Any]] = {}
         self.raw_ingest_processing_status: Dict[str, Dict[str, Any]] = {}
         self.raw_ingest_ocr: Dict[str, Dict[str, Any]] = {}
+        # raw_ingest assets/asset_counts by id
+        self.raw_ingest: Dict[str, Dict[str, Any]] = {}
+        self.raw_ingest_asset_writes = 0
+        # crawl_queue rows by id, in insert order
+        self.crawl_queue: Dict[str, Dict[str, Any]] = {}
+        # URLs of each bulk insert request
+        self.crawl_queue_inserts: List[List[str]] = []
+        self.crawl_queue_selects: List[str] = []
+        self.crawl_queue_deletes = 0
+        self.crawl_sources: Dict[str, Dict[str, Any]] = {}
+        self.crawl_source_upserts = 0
 
     def select_pending_ocr(self, limit: int = 5):
         return []
@@ -47,6 +70,133 @@ class FakeRepo:
         self.raw_ingest_processing_status[context_id] = dict(processing_status)
         self.raw_ingest_ocr[context_id] = dict(ocr)
 
+    def finalize_ocr(self, queue_id, context_id, queue_patch, processing_status_patch, ocr) -> None:
+        merged = {**self.raw_ingest_processing_status.get(context_id, {}), **processing_status_patch}
+        self.update_raw_ingest_ocr(context_id, processing_status=merged, ocr=ocr)
+        self.update_ocr_queue(queue_id, queue_patch)
+
+    def get_raw_ingest(self, context_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        row = self.raw_ingest.get(context_id)
+        return dict(row) if row is not None else None
+
+    def update_raw_ingest_assets(self, context_id: str, assets: Dict[str, Any], asset_counts: Dict[str, Any]) -> None:
+        self.raw_ingest_asset_writes += 1
+        self.raw_ingest.setdefault(context_id, {"id": context_id}).update(assets=assets, asset_counts=asset_counts)
+
+    def update_raw_ingest_assets_many(self, rows: List[Dict[str, Any]]) -> None:
+        self.raw_ingest_asset_writes += 1
+        for row in rows:
+            self.raw_ingest.setdefault(row["id"], {"id": row["id"]}).update(row)
+
+    # crawl_queue, modelled on migrations 002/003
+
+    def _pending_urls(self):
+        return {r["url"] for r in self.crawl_queue.values() if r.get("status") == "pending"}
+
+    def _due(self, limit: int, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        rows = [
+            r for r in self.crawl_queue.values()
+            if r.get("status") == "pending" and (domain is None or r.get("domain") == domain)
+        ]
+        return sorted(rows, key=lambda r: -r.get("priority_score", 0.0))[:limit]
+
+    def add_crawl_queue_row(self, **row) -> Dict[str, Any]:
+        row.setdefault("id", f"q{len(self.crawl_queue)}")
+        row.setdefault("status", "pending")
+        row.setdefault("attempts", 0)
+        self.crawl_queue[row["id"]] = row
+        return row
+
+    def insert_crawl_queue_if_absent(self, entry: Dict[str, Any]) -> Optional[str]:
+        if entry.get("status", "pending") == "pending" and entry["url"] in self._pending_urls():
+            return None
+        return self.add_crawl_queue_row(**entry)["id"]
+
+    def bulk_insert_crawl_queue(self, entries: List[Dict[str, Any]]) -> List[str]:
+        self.crawl_queue_inserts.append([e["url"] for e in entries])
+        # ON CONFLICT (id) DO NOTHING
+        new = [e for e in entries if e["id"] not in self.crawl_queue]
+        if any(e["url"] in self._pending_urls() for e in new):
+            raise UniqueViolation("duplicate key value violates unique constraint")
+        for entry in new:
+            self.add_crawl_queue_row(**entry)
+        return [e["id"] for e in entries]
+
+    def select_next_crawl_queue(self, limit, now_iso, domain=None, columns="*"):
+        self.crawl_queue_selects.append(columns)
+        rows = self._due(limit, domain)
+        if columns != "*":
+            wanted = columns.split(",")
+            rows = [{k: v for k, v in r.items() if k in wanted} for r in rows]
+        return [dict(r) for r in rows]
+
+    def claim_crawl_queue(self, limit, domain=None):
+        from datetime import datetime, timedelta, timezone
+
+        # Rows stuck in processing for over an hour are reclaimed first
+        stale = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        for row in self.crawl_queue.values():
+            if row["status"] == "processing" and row.get("processing_started_at", stale) < stale:
+                requeue = row["attempts"] < row.get("max_attempts", 3) and row["url"] not in self._pending_urls()
+                row["status"] = "pending" if requeue else "failed"
+
+        rows = self._due(limit, domain)
+        for row in rows:
+            row["status"] = "processing"
+            row["processing_started_at"] = datetime.now(timezone.utc).isoformat()
+            row["attempts"] += 1
+        return [dict(r) for r in rows]
+
+    def update_crawl_queue(self, queue_id: str, patch: Dict[str, Any]) -> None:
+        self.crawl_queue[queue_id].update(patch)
+
+    def mark_crawl_queue_processing(self, queue_id: str) -> bool:
+        if queue_id not in self.crawl_queue:
+            return False
+        self.update_crawl_queue(queue_id, {"status": "processing"})
+        self.crawl_queue[queue_id]["attempts"] += 1
+        return True
+
+    def mark_crawl_queue_failed(self, queue_id: str, error: str, retry: bool = True) -> Optional[str]:
+        row = self.crawl_queue.get(queue_id)
+        if row is None:
+            return None
+        requeue = (
+            retry
+            and row["attempts"] + 1 < row.get("max_attempts", 3)
+            and row["url"] not in self._pending_urls()
+        )
+        row["attempts"] += 1
+        row["last_error"] = error
+        row["status"] = "pending" if requeue else "failed"
+        return row["status"]
+
+    def mark_crawl_queue_many(self, transitions: List[Dict[str, Any]]) -> int:
+        updated = 0
+        for t in transitions:
+            if t["id"] in self.crawl_queue:
+                self.update_crawl_queue(t["id"], {k: v for k, v in t.items() if k != "id" and v is not None})
+                updated += 1
+        return updated
+
+    def delete_old_crawl_queue(self, cutoff_iso: str, limit: int) -> int:
+        self.crawl_queue_deletes += 1
+        old = [
+            r["id"] for r in self.crawl_queue.values()
+            if r.get("status") in ("completed", "failed") and r.get("completed_at", "") < cutoff_iso
+        ][:limit]
+        for queue_id in old:
+            del self.crawl_queue[queue_id]
+        return len(old)
+
+    def upsert_crawl_source(self, source: Dict[str, Any]) -> str:
+        self.crawl_source_upserts += 1
+        self.crawl_sources.setdefault(source["id"], dict(source))
+        return source["id"]
+
+    def get_crawl_sources(self, source_ids):
+        return {i: s for i, s in self.crawl_sources.items() if i in source_ids}
+
 
 # -------------------------
 # Tests
@@ -67,6 +217,626 @@ def test_url_manager_priority_scoring_is_bounded():
     assert 0.0 <= score <= 1.0
 
 
+def test_url_manager_source_reliability_matches_whole_labels():
+    from ingestion.url_manager import URLManager
+
+    assert URLManager._source_reliability("www.epid.gov.lk") == 0.95
+    assert URLManager._source_reliability("moh.gov.lk:8080") == 0.90
+    assert URLManager._source_reliability("www.gov.lk") == 0.85
+    assert URLManager._source_reliability("notgov.lk") == 0.70
+
+
+def test_url_manager_batch_scores_match_scalar_scores():
+    from ingestion.url_manager import URLManager
+
+    mgr = URLManager.__new__(URLManager)
+    urls = ["http://www.epid.gov.lk/a", "https://example.com/", "http://moh.gov.lk/b"]
+
+    batch = mgr.calculate_priority_scores(urls, priority_level="high", freshness_days=10, user_demand=0.5)
+    scalar = [
+        mgr.calculate_priority_score(url, priority_level="high", freshness_days=10, user_demand=0.5)
+        for url in urls
+    ]
+    assert batch == pytest.approx(scalar)
+
+
+def test_url_manager_numpy_priority_scores_match_python_fallback(monkeypatch):
+    pytest.importorskip("numpy")
+    import sys
+
+    from ingestion.url_manager import URLManager
+
+    mgr = URLManager.__new__(URLManager)
+    urls = ["http://www.epid.gov.lk/a", "https://example.com/", "http://moh.gov.lk/b", "http://www.gov.lk/"]
+    kwargs = dict(priority_level="critical", freshness_days=45, user_demand=0.9)
+
+    vectorized = mgr.calculate_priority_scores(urls, **kwargs)
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    fallback = mgr.calculate_priority_scores(urls, **kwargs)
+
+    assert vectorized == pytest.approx(fallback)
+
+
+def test_crawler_link_batch_scores_match_scalar_scores(monkeypatch):
+    pytest.importorskip("numpy")
+    pytest.importorskip("crawl4ai")
+    import sys
+
+    from ingestion.crawler_agent import AdaptiveCrawlerAgent
+
+    agent = AdaptiveCrawlerAgent.__new__(AdaptiveCrawlerAgent)
+    urls = [
+        "http://www.epid.gov.lk/dengue-schedule.pdf",
+        "https://example.com/health",
+        "/circular/2024",
+        "http://www.health.gov.lk/",
+    ]
+    texts = ["Dengue clinic", "", "Vaccine advisory", "Hospital report"]
+    scalar = [agent.score_link_relevance(url, text) for url, text in zip(urls, texts)]
+
+    assert agent.score_links_batch(urls, texts) == pytest.approx(scalar)
+    assert agent.score_links_batch(urls) == pytest.approx([agent.score_link_relevance(u, "") for u in urls])
+    assert agent.score_links_batch([]) == []
+
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    assert agent.score_links_batch(urls, texts) == pytest.approx(scalar)
+
+
+def test_url_manager_add_url_batch_chunks_and_preserves_order(monkeypatch):
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    mgr = URLManager(repo=repo)
+    monkeypatch.setattr(URLManager, "INSERT_BATCH_SIZE", 2)
+
+    urls = [f"https://www.health.gov.lk/page/{i}" for i in range(5)]
+    ids = mgr.add_url_batch(urls, source_config={"agency": "Test"})
+
+    assert len(ids) == 5
+    assert len(set(ids)) == 5
+    assert sorted(len(c) for c in repo.crawl_queue_inserts) == [1, 2, 2]
+    assert [repo.crawl_queue[i]["url"] for i in ids] == urls
+
+
+def test_url_manager_add_url_batch_builds_each_row_once(monkeypatch):
+    from ingestion.url_manager import QueueEntry, URLManager
+
+    built = []
+    to_dict = QueueEntry.to_dict
+    monkeypatch.setattr(QueueEntry, "to_dict", lambda self: built.append(self.url) or to_dict(self))
+    monkeypatch.setattr(URLManager, "INSERT_BATCH_SIZE", 2)
+    monkeypatch.setenv("CRAWL_QUEUE_INSERT_WORKERS", "1")
+
+    repo = FakeRepo()
+    urls = [f"https://www.health.gov.lk/page/{i}" for i in range(5)]
+    ids = URLManager(repo=repo).add_url_batch(urls, source_config={"agency": "Test"})
+
+    assert built == urls
+    assert [repo.crawl_queue[i]["url"] for i in ids] == urls
+
+
+def test_url_manager_chunks_respect_payload_bytes(monkeypatch):
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    mgr = URLManager(repo=repo)
+    monkeypatch.setattr(URLManager, "INSERT_BATCH_BYTES", 5_000)
+
+    # No agency, so the ~2 KB config is inlined into every row.
+    config = {"notes": "x" * 2_000}
+    ids = mgr.add_url_batch([f"https://www.health.gov.lk/{i}" for i in range(5)], config)
+
+    assert len(ids) == 5
+    assert sorted(len(c) for c in repo.crawl_queue_inserts) == [1, 2, 2]
+
+
+def test_url_manager_add_url_batch_skips_already_pending_urls():
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    repo.add_crawl_queue_row(url="https://www.health.gov.lk/a")
+    mgr = URLManager(repo=repo)
+
+    ids = mgr.add_url_batch(
+        ["https://www.health.gov.lk/a", "https://www.health.gov.lk/b"],
+        source_config={"agency": "Test"},
+    )
+
+    assert len(ids) == 1
+    assert repo._pending_urls() == {"https://www.health.gov.lk/a", "https://www.health.gov.lk/b"}
+
+
+def test_url_manager_add_url_batch_resends_chunk_after_lost_response(monkeypatch):
+    from ingestion.url_manager import URLManager
+
+    class FlakyRepo(FakeRepo):
+        def bulk_insert_crawl_queue(self, entries):
+            ids = super().bulk_insert_crawl_queue(entries)
+            if len(self.crawl_queue_inserts) == 1:
+                raise TimeoutError("read timed out")  # committed, response lost
+            return ids
+
+    monkeypatch.setattr(URLManager, "INSERT_RETRY_DELAY", 0.0)
+    repo = FlakyRepo()
+    urls = ["https://www.health.gov.lk/a", "https://www.health.gov.lk/b"]
+
+    ids = URLManager(repo=repo).add_url_batch(urls, source_config={"agency": "Test"})
+
+    assert [repo.crawl_queue[i]["url"] for i in ids] == urls
+    assert len(repo.crawl_queue) == 2
+
+
+def test_url_manager_add_url_batch_does_not_retry_database_errors():
+    from ingestion.url_manager import URLManager
+
+    class BrokenRepo(FakeRepo):
+        def bulk_insert_crawl_queue(self, entries):
+            self.crawl_queue_inserts.append([e["url"] for e in entries])
+            raise ValueError("column does not exist")
+
+    repo = BrokenRepo()
+    with pytest.raises(ValueError):
+        URLManager(repo=repo).add_url_batch(["https://www.health.gov.lk/a"], source_config={"agency": "Test"})
+    assert len(repo.crawl_queue_inserts) == 1
+
+
+def test_url_manager_mark_failed_fails_row_whose_url_was_requeued():
+    from ingestion.url_manager import URLManager
+
+    class RacingRepo(FakeRepo):
+        # The URL is re-queued between the function's check and its update
+        def mark_crawl_queue_failed(self, queue_id, error, retry=True):
+            raise UniqueViolation("duplicate key value violates unique constraint")
+
+    repo = RacingRepo()
+    repo.add_crawl_queue_row(id="old", url="https://x.gov.lk/a", status="processing")
+    repo.add_crawl_queue_row(id="new", url="https://x.gov.lk/a")
+
+    assert URLManager(repo=repo).mark_failed("old", "timeout") is True
+    assert repo.crawl_queue["old"]["status"] == "failed"
+    assert repo.crawl_queue["new"]["status"] == "pending"
+
+
+def test_url_manager_get_next_urls_is_a_read_only_peek():
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    for i in range(3):
+        repo.add_crawl_queue_row(id=f"q{i}", url=f"https://x.gov.lk/{i}", priority_score=i / 10)
+    mgr = URLManager(repo=repo)
+
+    first = mgr.get_next_urls(limit=2)
+    repo.add_crawl_queue_row(id="q9", url="https://x.gov.lk/9", priority_score=0.9)
+    second = mgr.get_next_urls(limit=2)
+
+    assert [e["doc_id"] for e in first] == ["q2", "q1"]
+    # Nothing was consumed, and the new row is visible at once
+    assert [e["doc_id"] for e in second] == ["q9", "q2"]
+    assert all(r["status"] == "pending" for r in repo.crawl_queue.values())
+
+
+def test_url_manager_get_next_urls_projects_columns():
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1", priority_score=0.5)
+    mgr = URLManager(repo=repo)
+
+    entries = mgr.get_next_urls(limit=1, columns="url")
+    mgr.get_next_urls(limit=1)
+
+    assert entries[0]["url"] == "https://x.gov.lk/1"
+    assert entries[0]["doc_id"] == "q1"
+    assert repo.crawl_queue_selects == ["id,url", "*"]
+
+
+def test_url_manager_stores_source_config_once_and_reattaches_it():
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    config = {"agency": "Epidemiology Unit", "language": "si"}
+    URLManager(repo=repo).add_url_batch(["https://www.epid.gov.lk/a", "https://www.epid.gov.lk/b"], config)
+
+    rows = list(repo.crawl_queue.values())
+    (source_id,) = repo.crawl_sources
+    assert len(source_id) == 64
+    assert all(r["source_id"] == source_id and "metadata" not in r for r in rows)
+
+    # A fresh manager has no in-process cache and must load the source.
+    claimed = URLManager(repo=repo).claim_next_urls(limit=2)
+    assert [c["metadata"] for c in claimed] == [config, config]
+
+
+def test_url_manager_source_configs_are_content_addressed():
+    from ingestion.url_manager import URLManager
+
+    repo = FakeRepo()
+    mgr = URLManager(repo=repo)
+    si = {"agency": "Epidemiology Unit", "language": "si"}
+    ta = {"agency": "Epidemiology Unit", "language": "ta"}
+    mgr.add_url("https://www.epid.gov.lk/si", si)
+    mgr.add_url("https://www.epid.gov.lk/ta", ta)
+    mgr.add_url("https://www.epid.gov.lk/si2", {"language": "si", "agency": "Epidemiology Unit"})
+
+    # Same agency, different configs: both survive; key order doesn't matter
+    assert repo.crawl_source_upserts == 2
+    by_url = {r["url"]: r["source_id"] for r in repo.crawl_queue.values()}
+    assert by_url["https://www.epid.gov.lk/si"] == by_url["https://www.epid.gov.lk/si2"]
+    assert repo.crawl_sources[by_url["https://www.epid.gov.lk/si"]]["metadata"] == si
+    assert repo.crawl_sources[by_url["https://www.epid.gov.lk/ta"]]["metadata"] == ta
+
+
+def test_url_manager_claim_falls_back_only_when_function_is_missing():
+    from ingestion.url_manager import URLManager
+
+    class PreMigrationRepo(FakeRepo):
+        claims = 0
+
+        def claim_crawl_queue(self, limit, domain=None):
+            self.claims += 1
+            raise MissingFunction("Could not find the function public.claim_crawl_urls")
+
+    repo = PreMigrationRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1", priority_score=0.5)
+    repo.add_crawl_queue_row(id="q2", url="https://x.gov.lk/2", priority_score=0.4)
+    mgr = URLManager(repo=repo)
+
+    assert [e["doc_id"] for e in mgr.claim_next_urls(limit=1)] == ["q1"]
+    assert [e["doc_id"] for e in mgr.claim_next_urls(limit=1)] == ["q2"]
+    # The missing function is remembered, not retried per call
+    assert repo.claims == 1
+
+
+def test_url_manager_claim_raises_other_rpc_errors():
+    from ingestion.url_manager import URLManager
+
+    class TimingOutRepo(FakeRepo):
+        def claim_crawl_queue(self, limit, domain=None):
+            raise TimeoutError("statement timeout")
+
+    repo = TimingOutRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1", priority_score=0.5)
+
+    with pytest.raises(TimeoutError):
+        URLManager(repo=repo).claim_next_urls(limit=1)
+    assert repo.crawl_queue["q1"]["status"] == "pending"
+
+
+def test_url_manager_queue_statistics_fall_back_only_when_function_is_missing():
+    from ingestion.url_manager import URLManager
+
+    class StatsRepo(FakeRepo):
+        error: Exception = MissingFunction("Could not find the function public.crawl_queue_stats")
+        calls = 0
+
+        def crawl_queue_status_counts(self):
+            self.calls += 1
+            raise self.error
+
+    repo = StatsRepo()
+    mgr = URLManager(repo=repo)
+    counted = []
+    mgr._count_status = lambda status: counted.append(status) or 1
+
+    assert mgr.get_queue_statistics()["total"] == 4
+    assert mgr.get_queue_statistics()["total"] == 4
+    # The missing function is remembered, not probed per call
+    assert repo.calls == 1
+
+    repo = StatsRepo()
+    repo.error = TimeoutError("statement timeout")
+    mgr = URLManager(repo=repo)
+    counted.clear()
+    mgr._count_status = lambda status: counted.append(status) or 1
+
+    assert mgr.get_queue_statistics()["total"] == 0
+    assert counted == []
+
+
+def test_url_manager_marks_are_not_repeated_after_rpc_errors():
+    from ingestion.url_manager import URLManager
+
+    class LostResponseRepo(FakeRepo):
+        # The update commits, then the response is lost
+        def mark_crawl_queue_processing(self, queue_id):
+            super().mark_crawl_queue_processing(queue_id)
+            raise TimeoutError("read timed out")
+
+        def mark_crawl_queue_failed(self, queue_id, error, retry=True):
+            super().mark_crawl_queue_failed(queue_id, error, retry)
+            raise TimeoutError("read timed out")
+
+    repo = LostResponseRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1")
+    mgr = URLManager(repo=repo)
+
+    assert mgr.mark_processing("q1") is False
+    assert mgr.mark_failed("q1", "boom") is False
+    assert repo.crawl_queue["q1"]["attempts"] == 2
+    assert repo.crawl_queue["q1"]["status"] == "pending"
+
+
+def test_url_manager_clean_old_entries_pages_until_short_batch(monkeypatch):
+    from ingestion.url_manager import URLManager
+
+    monkeypatch.setattr(URLManager, "CLEAN_BATCH_SIZE", 4)
+    repo = FakeRepo()
+    for i in range(10):
+        repo.add_crawl_queue_row(url=f"https://x.gov.lk/{i}", status="completed", completed_at="2000-01-01T00:00:00+00:00")
+
+    assert URLManager(repo=repo).clean_old_entries(days=30) == 10
+    assert repo.crawl_queue_deletes == 3
+
+
+def test_url_manager_clean_old_entries_raises_after_partial_progress(monkeypatch, caplog):
+    from ingestion.url_manager import URLManager
+
+    class FlakyRepo(FakeRepo):
+        def delete_old_crawl_queue(self, cutoff_iso, limit):
+            if self.crawl_queue_deletes:
+                raise TimeoutError("read timed out")
+            return super().delete_old_crawl_queue(cutoff_iso, limit)
+
+    monkeypatch.setattr(URLManager, "CLEAN_BATCH_SIZE", 4)
+    repo = FlakyRepo()
+    for i in range(10):
+        repo.add_crawl_queue_row(url=f"https://x.gov.lk/{i}", status="completed", completed_at="2000-01-01T00:00:00+00:00")
+
+    with pytest.raises(TimeoutError):
+        URLManager(repo=repo).clean_old_entries(days=30)
+    assert len(repo.crawl_queue) == 6
+    assert "after 4 old entries" in caplog.text
+
+
+async def test_domain_token_bucket_spaces_requests_by_rate_limit_delay():
+    import asyncio
+    import time
+
+    from ingestion.rate_limit import DomainTokenBucket
+
+    bucket = DomainTokenBucket(rate_limit_delay=0.05)
+    start = time.monotonic()
+    waits = await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+
+    # First request goes straight through; the other two are spaced out.
+    assert waits[0] == 0.0
+    assert time.monotonic() - start >= 0.09
+
+
+async def test_orchestrator_queue_writes_do_not_block_other_pages():
+    import asyncio
+    import time
+
+    from run_ingestion import IngestionOrchestrator
+
+    class FakeCrawler:
+        async def crawl(self, url, source_config, extraction_strategy):
+            if url.endswith("/bad"):
+                return {"success": False, "error": "404"}
+            await asyncio.sleep(0.05)
+            return {"success": True, "context_id": "ctx-good"}
+
+    class SlowURLManager:
+        def mark_failed(self, doc_id, error_message, retry=True):
+            time.sleep(0.2)  # a slow Supabase round-trip
+            return True
+
+    class FakeSegregator:
+        def segregate_from_context(self, context_obj):
+            return dict(context_obj, asset_counts={})
+
+    orch = IngestionOrchestrator.__new__(IngestionOrchestrator)
+    orch.crawler = FakeCrawler()
+    orch.url_manager = SlowURLManager()
+    orch.segregator = FakeSegregator()
+
+    start = time.monotonic()
+    finished = {}
+
+    async def run(entry):
+        outcome = await orch._process_entry(entry)
+        finished[entry["doc_id"]] = time.monotonic() - start
+        return outcome
+
+    bad, good = await asyncio.gather(
+        run({"doc_id": "q-bad", "url": "https://x.gov.lk/bad"}),
+        run({"doc_id": "q-good", "url": "https://x.gov.lk/good"}),
+    )
+
+    assert bad[1]["status"] == "failed" and good[1]["status"] == "success"
+    assert finished["q-good"] < 0.15 < finished["q-bad"]
+
+
+async def test_orchestrator_records_a_pages_downloads_in_one_write():
+    import asyncio
+
+    from ingestion.asset_segregator import AssetSegregator
+    from run_ingestion import IngestionOrchestrator
+
+    repo = FakeRepo()
+    repo.raw_ingest["ctx1"] = {"id": "ctx1", "assets": {"pdf_links": []}, "asset_counts": {"pdf": 3}}
+    segregator = AssetSegregator(repo=repo)
+    ocr_paths = []
+
+    async def fake_fetch(url, asset_type, context_id):
+        await asyncio.sleep(0)
+        return {"asset_type": asset_type, "url": url, "storage_path": f"pdfs-raw/{context_id}/{url[-5:]}"}
+
+    segregator.fetch_and_store_asset = fake_fetch
+    segregator.create_ocr_queue_entry = lambda storage_path, **kw: ocr_paths.append(storage_path)
+
+    orch = IngestionOrchestrator.__new__(IngestionOrchestrator)
+    orch.segregator = segregator
+    orch._download_slots = asyncio.Semaphore(IngestionOrchestrator.MAX_CONCURRENT_DOWNLOADS)
+    orch._host_download_slots = {}
+
+    pdf_links = [
+        {"url": f"https://x.gov.lk/{i}.pdf", "needs_download": True, "needs_ocr": i == 0}
+        for i in range(3)
+    ]
+    await orch._process_assets({"assets": {"pdf_links": pdf_links}}, "ctx1")
+
+    row = repo.raw_ingest["ctx1"]
+    assert repo.raw_ingest_asset_writes == 1
+    assert row["assets"]["downloaded"] == {
+        "pdf": {"url": "https://x.gov.lk/2.pdf", "storage_path": "pdfs-raw/ctx1/2.pdf"},
+    }
+    assert row["asset_counts"] == {"pdf": 3}
+    assert ocr_paths == ["pdfs-raw/ctx1/0.pdf"]
+
+
+async def test_crawl_seed_urls_offers_a_link_again_after_a_failed_add():
+    from collections import OrderedDict
+
+    from run_ingestion import IngestionOrchestrator
+
+    class FakeCrawler:
+        async def crawl(self, url, source_config, extraction_strategy):
+            return {"success": True, "content": {"links": {"internal": ["https://x.gov.lk/dengue"]}}}
+
+        def score_links_batch(self, links):
+            return [0.9 for _ in links]
+
+    class FlakyURLManager:
+        def __init__(self):
+            self.added = []
+
+        def add_url(self, url, source_config, priority="medium"):
+            if not self.added:
+                self.added.append(None)
+                raise TimeoutError("read timed out")
+            self.added.append(url)
+            return "q1"
+
+    orch = IngestionOrchestrator.__new__(IngestionOrchestrator)
+    orch.crawler = FakeCrawler()
+    orch.url_manager = FlakyURLManager()
+    orch._seen_urls = OrderedDict()
+
+    config = {"agency": "Epidemiology Unit"}
+    assert await orch.crawl_seed_urls(["https://x.gov.lk/"], config) == []
+    assert await orch.crawl_seed_urls(["https://x.gov.lk/"], config) == ["https://x.gov.lk/dengue"]
+    assert orch.url_manager.added == [None, "https://x.gov.lk/dengue"]
+
+
+async def test_crawl_seed_urls_counts_only_newly_queued_links():
+    from collections import OrderedDict
+
+    from ingestion.url_manager import URLManager
+    from run_ingestion import IngestionOrchestrator
+
+    class FakeCrawler:
+        async def crawl(self, url, source_config, extraction_strategy):
+            return {"success": True, "content": {"links": {"internal": ["https://x.gov.lk/a", "https://x.gov.lk/b"]}}}
+
+        def score_links_batch(self, links):
+            return [0.9 for _ in links]
+
+    repo = FakeRepo()
+    repo.add_crawl_queue_row(url="https://x.gov.lk/a")  # queued by another process
+    orch = IngestionOrchestrator.__new__(IngestionOrchestrator)
+    orch.crawler = FakeCrawler()
+    orch.url_manager = URLManager(repo=repo)
+    orch._seen_urls = OrderedDict()
+
+    assert await orch.crawl_seed_urls(["https://x.gov.lk/"], {"agency": "Test"}) == ["https://x.gov.lk/b"]
+
+
+def test_url_manager_mark_many_falls_back_to_row_updates():
+    from ingestion.url_manager import URLManager
+
+    class LegacyRepo(FakeRepo):
+        def mark_crawl_queue_many(self, transitions):
+            raise MissingFunction("Could not find the function public.crawl_queue_mark_many")
+
+    repo = LegacyRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1", status="processing")
+    repo.add_crawl_queue_row(id="q2", url="https://x.gov.lk/2", status="processing")
+    updated = URLManager(repo=repo).mark_many([
+        {"doc_id": "q1", "status": "completed", "context_id": "ctx1"},
+        {"doc_id": "q2", "status": "failed"},
+    ])
+
+    assert updated == 2
+    assert repo.crawl_queue["q1"]["context_id"] == "ctx1"
+    assert "completed_at" in repo.crawl_queue["q1"]
+    assert repo.crawl_queue["q2"]["status"] == "failed"
+    assert "completed_at" not in repo.crawl_queue["q2"]
+
+
+def test_url_manager_mark_many_does_not_fall_back_after_other_errors():
+    from ingestion.url_manager import URLManager
+
+    class TimingOutRepo(FakeRepo):
+        def mark_crawl_queue_many(self, transitions):
+            raise TimeoutError("statement timeout")
+
+    repo = TimingOutRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/1", status="processing")
+
+    assert URLManager(repo=repo).mark_many([{"doc_id": "q1", "status": "completed"}]) == 0
+    assert repo.crawl_queue["q1"]["status"] == "processing"
+
+
+def _queue_orchestrator(repo):
+    """IngestionOrchestrator over `repo` with a crawler that fails URLs ending in /bad."""
+    import asyncio
+
+    from ingestion.asset_segregator import AssetSegregator
+    from ingestion.url_manager import URLManager
+    from run_ingestion import IngestionOrchestrator
+
+    class FakeCrawler:
+        async def crawl(self, url, source_config, extraction_strategy):
+            await asyncio.sleep(0)
+            if url.endswith("/bad"):
+                return {"success": False, "error": "503"}
+            return {"success": True, "url": url, "context_id": "ctx-" + url.rsplit("/", 1)[1]}
+
+    orch = IngestionOrchestrator.__new__(IngestionOrchestrator)
+    orch.crawler = FakeCrawler()
+    orch.url_manager = URLManager(repo=repo)
+    orch.segregator = AssetSegregator(repo=repo)
+    orch.max_concurrent = 2
+    orch._download_slots = asyncio.Semaphore(IngestionOrchestrator.MAX_CONCURRENT_DOWNLOADS)
+    orch._host_download_slots = {}
+    return orch
+
+
+async def test_orchestrator_process_queue_leaves_no_row_processing():
+    repo = FakeRepo()
+    repo.add_crawl_queue_row(id="q-ok", url="https://x.gov.lk/ok", priority_score=0.9)
+    repo.add_crawl_queue_row(id="q-bad", url="https://x.gov.lk/bad", priority_score=0.5)
+    # Claimed by a worker that died before marking it
+    repo.add_crawl_queue_row(
+        id="q-stale", url="https://x.gov.lk/stale", priority_score=0.1,
+        status="processing", attempts=1, processing_started_at="2000-01-01T00:00:00+00:00",
+    )
+
+    results = await _queue_orchestrator(repo).process_queue(batch_size=10)
+
+    assert (results["processed"], results["successful"], results["failed"]) == (3, 2, 1)
+    statuses = {queue_id: row["status"] for queue_id, row in repo.crawl_queue.items()}
+    assert statuses == {"q-ok": "completed", "q-bad": "pending", "q-stale": "completed"}
+    assert repo.crawl_queue["q-stale"]["context_id"] == "ctx-stale"
+    assert sorted(repo.raw_ingest) == ["ctx-ok", "ctx-stale"]
+
+
+async def test_orchestrator_process_queue_completes_rows_when_bulk_mark_fails():
+    class TimingOutRepo(FakeRepo):
+        def mark_crawl_queue_many(self, transitions):
+            raise TimeoutError("statement timeout")
+
+    repo = TimingOutRepo()
+    repo.add_crawl_queue_row(id="q1", url="https://x.gov.lk/one")
+    repo.add_crawl_queue_row(id="q2", url="https://x.gov.lk/two")
+
+    await _queue_orchestrator(repo).process_queue(batch_size=10)
+
+    assert {r["status"] for r in repo.crawl_queue.values()} == {"completed"}
+    assert repo.crawl_queue["q2"]["context_id"] == "ctx-two"
+
+
 def test_asset_segregator_detects_pdf_and_image_without_backend():
     from ingestion.asset_segregator import AssetSegregator
 
@@ -113,6 +883,154 @@ def test_ocr_processor_writes_results_to_supabase_repo():
     assert q["result"]["text_length"] == len("hello from pdf")
 
 
+def test_ocr_processor_falls_back_when_finalize_ocr_is_missing():
+    from ingestion.ocr_processor import OCRProcessor
+
+    class LegacyRepo(FakeRepo):
+        finalize_calls = 0
+
+        def finalize_ocr(self, *args, **kwargs):
+            self.finalize_calls += 1
+            raise MissingFunction("Could not find the function public.finalize_ocr")
+
+    class StubBackend:
+        def extract_text_pdf(self, data: bytes) -> str:
+            return "text"
+
+        def extract_text_image(self, data: bytes) -> str:
+            raise AssertionError("not used")
+
+    repo = LegacyRepo({"pdfs-raw/ctx1/a.pdf": b"%PDF-1.4\n"})
+    repo.raw_ingest_processing_status["ctx1"] = {"ocr_required": True, "language": "si"}
+
+    processor = OCRProcessor(repo=repo, backend=StubBackend())
+    entry = {"storage_path": "pdfs-raw/ctx1/a.pdf", "context_id": "ctx1", "asset_type": "pdf"}
+    processor.process_queue_entry("q1", entry)
+    processor.process_queue_entry("q2", entry)
+
+    assert repo.raw_ingest_processing_status["ctx1"]["language"] == "si"
+    assert repo.raw_ingest_processing_status["ctx1"]["ocr_completed"] is True
+    assert repo.ocr_queue_updates["q1"]["status"] == "completed"
+    # The missing function is remembered, not retried per entry
+    assert repo.finalize_calls == 1
+
+
+def test_ocr_processor_raises_other_finalize_ocr_errors():
+    from ingestion.ocr_processor import OCRProcessor
+
+    class TimingOutRepo(FakeRepo):
+        def finalize_ocr(self, *args, **kwargs):
+            raise TimeoutError("read timed out")
+
+    class StubBackend:
+        def extract_text_pdf(self, data: bytes) -> str:
+            return "text"
+
+        def extract_text_image(self, data: bytes) -> str:
+            raise AssertionError("not used")
+
+    repo = TimingOutRepo({"pdfs-raw/ctx1/a.pdf": b"%PDF-1.4\n"})
+    entry = {"storage_path": "pdfs-raw/ctx1/a.pdf", "context_id": "ctx1", "asset_type": "pdf"}
+
+    with pytest.raises(TimeoutError):
+        OCRProcessor(repo=repo, backend=StubBackend()).process_queue_entry("q1", entry)
+    # No partial, non-atomic write-back
+    assert "ctx1" not in repo.raw_ingest_ocr
+    assert repo.ocr_queue_updates["q1"]["status"] == "processing"
+
+
+def test_ocr_processor_prefers_streamed_download_and_closes_it():
+    import io
+
+    from ingestion.ocr_processor import OCRProcessor
+
+    class StreamingRepo(FakeRepo):
+        def download_stream(self, path: str):
+            self.stream = io.BytesIO(self.download_bytes(path))
+            return self.stream
+
+    repo = StreamingRepo({"pdfs-raw/ctx1/a.pdf": b"%PDF-1.4\n%fake\n"})
+
+    class StubBackend:
+        def extract_text_pdf(self, data) -> str:
+            assert data.read().startswith(b"%PDF")
+            return "streamed"
+
+        def extract_text_image(self, data) -> str:
+            raise AssertionError("not used")
+
+    entry = {"storage_path": "pdfs-raw/ctx1/a.pdf", "context_id": "ctx1", "asset_type": "pdf"}
+    result = OCRProcessor(repo=repo, backend=StubBackend()).process_queue_entry("q1", entry)
+
+    assert result.text == "streamed"
+    assert repo.stream.closed
+
+
+async def test_ocr_processor_pipelined_batch_completes_and_fails_entries():
+    from ingestion.ocr_processor import OCRProcessor
+
+    repo = FakeRepo({"pdfs-raw/ctx1/a.pdf": b"%PDF-1.4\n", "pdfs-raw/ctx2/b.pdf": b"%PDF-1.4\n"})
+    repo.select_pending_ocr = lambda limit=5: [
+        {"id": "q1", "storage_path": "pdfs-raw/ctx1/a.pdf", "context_id": "ctx1", "asset_type": "pdf"},
+        {"id": "q2", "storage_path": "pdfs-raw/missing.pdf", "context_id": "ctx9", "asset_type": "pdf"},
+        {"id": "q3", "storage_path": "pdfs-raw/ctx2/b.pdf", "context_id": "ctx2", "asset_type": "pdf"},
+    ]
+
+    class StubBackend:
+        def extract_text_pdf(self, data: bytes) -> str:
+            return "text"
+
+        def extract_text_image(self, data: bytes) -> str:
+            raise AssertionError("not used")
+
+    stats = await OCRProcessor(repo=repo, backend=StubBackend()).process_pending_pipelined(limit=5)
+
+    assert stats == {"processed": 3, "completed": 2, "failed": 1}
+    assert repo.ocr_queue_updates["q2"]["status"] == "failed"
+    assert repo.raw_ingest_ocr["ctx2"]["text"] == "text"
+
+
+async def test_ocr_processor_pipelined_batch_stops_cleanly_when_failing_an_entry_fails():
+    import asyncio
+    import io
+
+    from ingestion.ocr_processor import OCRProcessor
+
+    class BrokenRepo(FakeRepo):
+        def __init__(self):
+            super().__init__()
+            self.streams: List[io.BytesIO] = []
+
+        def download_stream(self, path: str):
+            self.streams.append(io.BytesIO(b"%PDF-1.4\n"))
+            return self.streams[-1]
+
+        def update_ocr_queue(self, queue_id, patch):
+            if patch.get("status") == "failed":
+                raise TimeoutError("read timed out")
+            super().update_ocr_queue(queue_id, patch)
+
+    repo = BrokenRepo()
+    repo.select_pending_ocr = lambda limit=5: [
+        {"id": f"q{i}", "storage_path": f"pdfs-raw/ctx{i}/a.pdf", "context_id": f"ctx{i}", "asset_type": "pdf"}
+        for i in range(5)
+    ]
+
+    class FailingBackend:
+        def extract_text_pdf(self, data) -> str:
+            raise ValueError("unreadable PDF")
+
+        def extract_text_image(self, data) -> str:
+            raise AssertionError("not used")
+
+    processor = OCRProcessor(repo=repo, backend=FailingBackend())
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(processor.process_pending_pipelined(limit=5, prefetch=1), timeout=2.0)
+
+    # The first entry's file and any prefetched ones are all closed
+    assert repo.streams and all(s.closed for s in repo.streams)
+
+
 def test_ingestion_package_import_is_safe_without_crawl4ai(monkeypatch):
     """Importing ingestion should not crash if Crawl4AI isn't installed.
 
@@ -142,3 +1060,159 @@ def test_source_registry_loads_defaults():
     assert targets.get("ta") == 0.25
     assert targets.get("en") == 0.20
     assert targets.get("romanized") == 0.15
+
+
+def _scheduler(monkeypatch, tmp_path, **kwargs):
+    # run_scheduled opens scheduler.log in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    from run_scheduled import IngestionScheduler
+
+    return IngestionScheduler(**kwargs)
+
+
+def test_scheduler_sleeps_until_the_next_task_is_due(monkeypatch, tmp_path):
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    sched = _scheduler(monkeypatch, tmp_path, crawl_interval_hours=1.0)
+    sched._last_crawl_mono = time.monotonic()
+    sched._next_bias_audit_at = datetime.now(timezone.utc) + timedelta(hours=2)
+
+    assert 3590 < sched._seconds_until_next_run() <= 3600
+
+
+async def test_scheduler_backs_off_exponentially_after_failures(monkeypatch, tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    import run_ingestion
+
+    sched = _scheduler(monkeypatch, tmp_path)
+    sched._next_bias_audit_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    class BrokenOrchestrator:
+        def __init__(self, **kwargs):
+            raise RuntimeError("supabase down")
+
+    monkeypatch.setattr(run_ingestion, "IngestionOrchestrator", BrokenOrchestrator)
+
+    # The crawl is overdue until a cycle succeeds
+    delays = []
+    for _ in range(6):
+        await sched.run_crawl_cycle()
+        delays.append(sched._seconds_until_next_run())
+
+    assert delays == pytest.approx([300, 600, 1200, 2400, 3600, 3600], abs=1)
+    assert not sched.should_run_crawl()
+
+
+def test_scheduler_backs_off_each_task_separately(monkeypatch, tmp_path):
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    sched = _scheduler(monkeypatch, tmp_path, crawl_interval_hours=12.0)
+    sched._next_bias_audit_at = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    for _ in range(3):
+        sched._record_failure("bias_audit")
+    # A crawl succeeding in between leaves the audit's backoff alone
+    sched._record_failure("crawl")
+    sched._record_success("crawl")
+    sched._last_crawl_mono = time.monotonic()
+
+    assert not sched.should_run_bias_audit()
+    assert sched._seconds_until_next_run() == pytest.approx(1200, abs=1)
+
+
+async def test_scheduler_reuses_one_orchestrator_across_cycles(monkeypatch, tmp_path):
+    import corpus.annotation_processor
+    import ingestion.supabase_repo
+    import run_ingestion
+
+    sched = _scheduler(monkeypatch, tmp_path)
+
+    class FakeOrchestrator:
+        built = 0
+
+        def __init__(self, **kwargs):
+            FakeOrchestrator.built += 1
+            self.ocr_runs = 0
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+        async def process_queue(self, batch_size, details_sink):
+            return {"processed": 0, "successful": 0, "failed": 0}
+
+        def process_ocr_queue(self, limit=5):
+            self.ocr_runs += 1
+            return {}
+
+    class StubRepo:
+        def get_raw_ingest_many(self, context_ids):
+            return {}
+
+    monkeypatch.setattr(run_ingestion, "IngestionOrchestrator", FakeOrchestrator)
+    monkeypatch.setattr(corpus.annotation_processor, "AnnotationProcessor", lambda: object())
+    monkeypatch.setattr(ingestion.supabase_repo.SupabaseRepo, "from_env", classmethod(lambda cls: StubRepo()))
+
+    await sched.run_crawl_cycle()
+    await sched.run_crawl_cycle()
+
+    assert FakeOrchestrator.built == 1
+    assert sched._orchestrator.ocr_runs == 2
+
+
+async def test_scheduler_trigger_runs_the_task(monkeypatch, tmp_path):
+    import asyncio
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    sched = _scheduler(monkeypatch, tmp_path)
+    sched._last_crawl_mono = time.monotonic()
+    sched._next_bias_audit_at = datetime.now(timezone.utc) + timedelta(days=1)
+    ran = []
+
+    async def audit():
+        ran.append("bias_audit")
+        sched.stop()
+
+    sched.run_bias_audit = audit
+
+    with pytest.raises(ValueError):
+        sched.trigger("reindex")
+
+    loop_task = asyncio.create_task(sched.start())
+    await asyncio.sleep(0.01)
+    sched.trigger("bias_audit")
+    await asyncio.wait_for(loop_task, timeout=1.0)
+
+    assert ran == ["bias_audit"]
+
+
+async def test_scheduler_stop_from_another_thread_wakes_the_loop(monkeypatch, tmp_path):
+    import asyncio
+    import threading
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    sched = _scheduler(monkeypatch, tmp_path)
+    sched._last_crawl_mono = time.monotonic()
+    sched._next_bias_audit_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    loop_task = asyncio.create_task(sched.start())
+    await asyncio.sleep(0.01)
+    def stop_later():
+        time.sleep(0.05)  # let the loop block waiting for a trigger
+        sched.stop()
+
+    # A bare thread: nothing else on the loop's side wakes it up
+    stopper = threading.Thread(target=stop_later)
+    start = time.monotonic()
+    stopper.start()
+
+    await asyncio.wait_for(loop_task, timeout=1.0)
+    stopper.join()
+    assert time.monotonic() - start < 0.5
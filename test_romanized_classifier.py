@@ -162,6 +162,26 @@ class TestRomanizedClassifier:
         assert results[1].classification == RomanizedType.TAMILISH
         assert results[2].classification == RomanizedType.PURE_ENGLISH
     
+    def test_classify_batch_in_worker_processes(self, classifier):
+        """Test large batches can be spread over worker processes."""
+        texts = [f"mage amma koheda {i}" for i in range(40)]
+        results = classifier.classify_batch(texts, max_workers=2)
+        
+        assert len(results) == 40
+        assert all(r.classification == RomanizedType.SINGLISH for r in results)
+    
+    def test_classify_caches_short_texts(self, classifier):
+        """Test repeated short texts are served from the cache."""
+        first = classifier.classify("mage amma koheda")
+        
+        assert classifier.classify("mage amma koheda") is first
+        assert classifier.classify("amma " * 200) is not classifier.classify("amma " * 200)
+    
+    def test_single_known_word_matches_full_classification(self, classifier):
+        """Test the single-word lookup agrees with the tokenizing path."""
+        for word in ("koheda", " Naan ", "HOSPITAL", "enna"):
+            assert classifier.classify(word) == classifier._classify_uncached(word)
+    
     # -------------------------
     # Convenience Function Test
     # -------------------------
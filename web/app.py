@@ -10,14 +10,24 @@ FastAPI application for:
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+
+try:  # Optional: faster JSON serialization for /api/* responses
+    import orjson  # noqa: F401
+    _JSON_RESPONSE = ORJSONResponse
+except ImportError:
+    _JSON_RESPONSE = JSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -25,13 +35,18 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Multilingual Health Corpus",
     description="Sri Lankan Health Corpus Management System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_JSON_RESPONSE
 )
 
 # Setup templates
 templates_dir = Path(__file__).parent / "templates"
 templates_dir.mkdir(exist_ok=True)
 templates = Jinja2Templates(directory=str(templates_dir))
+# Compiled templates persist across restarts (in a per-user temp dir);
+# outside development, skip the per-render source mtime checks
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+templates.env.auto_reload = os.getenv("APP_ENV", "development") == "development"
 
 # Lazy repo initialization
 _repo = None
@@ -45,6 +60,49 @@ def get_repo():
     return _repo
 
 
+_url_manager = None
+
+def get_url_manager():
+    """Get or create the URLManager, sharing the repo and its source cache."""
+    global _url_manager
+    if _url_manager is None:
+        from ingestion.url_manager import URLManager
+        _url_manager = URLManager(repo=get_repo())
+    return _url_manager
+
+
+# Corpus statistics and bias distributions change over minutes, not
+# per request; serve repeats from memory for this long
+STATS_TTL_SECONDS = 30
+BIAS_REPORT_TTL_SECONDS = 300
+
+# key -> (expires_at on time.monotonic(), value)
+_ttl_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+async def _cached(key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+    """Return the cached value for `key`, refreshing it in a thread once stale."""
+    hit = _ttl_cache.get(key)
+    if hit is not None and time.monotonic() < hit[0]:
+        return hit[1]
+    value = await asyncio.to_thread(fetch)
+    _ttl_cache[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+async def get_corpus_statistics() -> Optional[Dict[str, Any]]:
+    """Latest corpus statistics, cached for STATS_TTL_SECONDS."""
+    return await _cached("stats", STATS_TTL_SECONDS, get_repo().get_latest_corpus_statistics)
+
+
+async def get_bias_distribution():
+    """Current bias distribution report, cached for BIAS_REPORT_TTL_SECONDS."""
+    from corpus.bias_auditor import BiasAuditor
+    
+    auditor = BiasAuditor(get_repo())
+    return await _cached("bias_report", BIAS_REPORT_TTL_SECONDS, auditor.calculate_distribution)
+
+
 # ========================================
 # Dashboard Routes
 # ========================================
@@ -55,17 +113,21 @@ async def dashboard(request: Request):
     try:
         repo = get_repo()
         
-        # Get statistics
-        stats = repo.get_latest_corpus_statistics()
-        
-        # Get recent Q&A pairs
-        qa_pairs = repo.get_qa_pairs(limit=10)
+        def count_pending():
+            # The planner's row estimate is plenty for a dashboard figure and
+            # avoids a COUNT(*) over every pending row
+            resp = repo.supabase.table("crawl_queue").select(
+                "id", count="planned"
+            ).eq("status", "pending").limit(1).execute()
+            return getattr(resp, "count", 0) or 0
         
-        # Get queue status
-        pending_resp = repo.supabase.table("crawl_queue").select(
-            "id", count="exact"
-        ).eq("status", "pending").execute()
-        pending_count = getattr(pending_resp, "count", 0) or 0
+        # Statistics, recent Q&A pairs and queue status are independent;
+        # fetch them concurrently off the event loop
+        stats, qa_pairs, pending_count = await asyncio.gather(
+            get_corpus_statistics(),
+            asyncio.to_thread(repo.get_qa_pairs, limit=10),
+            _cached("pending_urls", STATS_TTL_SECONDS, count_pending),
+        )
         
         return templates.TemplateResponse("dashboard.html", {
             "request": request,
@@ -85,12 +147,11 @@ async def review_page(request: Request):
         repo = get_repo()
         
         # Get unverified Q&A pairs
-        qa_pairs = repo.get_qa_pairs(limit=50, verified_only=False)
-        unverified = [qa for qa in qa_pairs if not qa.get("verified")]
+        qa_pairs = await asyncio.to_thread(repo.get_qa_pairs, limit=50, unverified_only=True)
         
         return templates.TemplateResponse("review.html", {
             "request": request,
-            "qa_pairs": unverified
+            "qa_pairs": qa_pairs
         })
     except Exception as e:
         logger.error(f"Review page error: {e}")
@@ -102,11 +163,9 @@ async def bias_report(request: Request):
     """Bias report visualization."""
     try:
         from corpus.bias_auditor import BiasAuditor
-        repo = get_repo()
         
-        auditor = BiasAuditor(repo)
-        report = auditor.calculate_distribution()
-        markdown = auditor.generate_markdown_report(report)
+        report = await get_bias_distribution()
+        markdown = BiasAuditor(get_repo()).generate_markdown_report(report)
         
         return templates.TemplateResponse("bias_report.html", {
             "request": request,
@@ -126,8 +185,7 @@ async def bias_report(request: Request):
 async def get_statistics():
     """Get corpus statistics."""
     try:
-        repo = get_repo()
-        stats = repo.get_latest_corpus_statistics()
+        stats = await get_corpus_statistics()
         return stats or {}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -180,14 +238,21 @@ async def get_document(context_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.on_event("startup")
+async def _load_annotation_processor():
+    """Build the NLP pipeline once per worker instead of once per request."""
+    from corpus.annotation_processor import AnnotationProcessor
+    
+    app.state.annotation_processor = AnnotationProcessor()
+
+
 @app.post("/api/annotate")
-async def annotate_text_api(text: str, source_url: Optional[str] = None):
+async def annotate_text_api(request: Request, text: str, source_url: Optional[str] = None):
     """Annotate text using the NLP pipeline."""
     try:
-        from corpus.annotation_processor import AnnotationProcessor
         from uuid import uuid4
         
-        processor = AnnotationProcessor()
+        processor = request.app.state.annotation_processor
         result = processor.process(
             text=text,
             context_id=str(uuid4()),
@@ -204,12 +269,7 @@ async def annotate_text_api(text: str, source_url: Optional[str] = None):
 async def get_bias_report():
     """Get current bias report."""
     try:
-        from corpus.bias_auditor import BiasAuditor
-        repo = get_repo()
-        
-        auditor = BiasAuditor(repo)
-        report = auditor.calculate_distribution()
-        
+        report = await get_bias_distribution()
         return report.to_dict()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -219,10 +279,7 @@ async def get_bias_report():
 async def add_to_queue(url: str, priority: str = "medium"):
     """Add URL to crawl queue."""
     try:
-        from ingestion.url_manager import URLManager
-        
-        manager = URLManager()
-        queue_id = manager.add_url(
+        queue_id = get_url_manager().add_url(
             url=url,
             source_config={"priority": priority, "agency": "api_submission"}
         )